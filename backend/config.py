@@ -45,6 +45,11 @@ class Settings(BaseSettings):
 
     # --- File Search: Local ---
     file_search_local_roots: str = ""  # comma-separated root dirs
+    file_search_cache_enabled: bool = True  # cache extracted document text (needs diskcache)
+    file_search_cache_dir: str = "./data/cache/file_search"
+    file_search_cache_max_mb: int = 512
+    file_search_use_hyperscan: bool = False  # presence pre-check for content search (needs hyperscan)
+    file_search_pool_size: int = 64  # threads for asyncio.to_thread (default executor)
 
     # --- Email Search: Gmail ---
     gmail_credentials_json: str = ""  # path to OAuth client credentials
@@ -3,6 +3,8 @@
 FastAPI entry point.
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -16,12 +18,23 @@ from storage.database import init_db
 async def lifespan(app: FastAPI):
     """Startup / shutdown lifecycle."""
     ensure_dirs(settings)
+    # Blocking tool work (file search roots, cloud SDKs, ...) runs through
+    # asyncio.to_thread; size its pool for I/O rather than min(32, cpu + 4)
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=settings.file_search_pool_size,
+            thread_name_prefix="to_thread",
+        )
+    )
     await init_db()
     # Start the scheduler background service
     from scheduler.scheduler import scheduler
     await scheduler.start()
     yield
     await scheduler.stop()
+    # Close pooled clients held by tools
+    from tools import shutdown_tools
+    await shutdown_tools()
 
 
 app = FastAPI(
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import inspect
+import os
 from abc import ABC, abstractmethod
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
 
 
 class BaseTool(ABC):
@@ -18,6 +21,90 @@ class BaseTool(ABC):
         ...
 
 
+# Cleanup callbacks for long-lived resources (pooled clients, connections)
+# that tools keep across calls. Run once on application shutdown.
+_SHUTDOWN_HOOKS: list[Callable[[], Any]] = []
+
+
+def register_shutdown(hook: Callable[[], Any]) -> None:
+    """Register a sync or async callable to run on application shutdown."""
+    if hook not in _SHUTDOWN_HOOKS:
+        _SHUTDOWN_HOOKS.append(hook)
+
+
+async def shutdown_tools() -> None:
+    """Run all registered shutdown hooks, ignoring individual failures."""
+    while _SHUTDOWN_HOOKS:
+        hook = _SHUTDOWN_HOOKS.pop()
+        try:
+            result = hook()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            pass
+
+
+# Shared process pool for CPU-bound tool work (document text extraction)
+PROCESS_POOL_WORKERS = os.cpu_count() or 1
+_PROCESS_POOL: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor | None:
+    """Return the shared process pool, or None on single-CPU hosts.
+
+    Callers fall back to running the work in the current thread on None.
+    """
+    global _PROCESS_POOL
+    if PROCESS_POOL_WORKERS < 2:
+        return None
+    if _PROCESS_POOL is None:
+        _PROCESS_POOL = ProcessPoolExecutor(max_workers=PROCESS_POOL_WORKERS)
+        register_shutdown(_close_process_pool)
+    return _PROCESS_POOL
+
+
+def _close_process_pool() -> None:
+    global _PROCESS_POOL
+    if _PROCESS_POOL is not None:
+        _PROCESS_POOL.shutdown(wait=False, cancel_futures=True)
+        _PROCESS_POOL = None
+
+
+# Shared HTTP client for tools calling web APIs (httpx is imported lazily)
+_HTTP_CLIENT: Any = None
+
+
+def get_http_client() -> Any:
+    """Return the shared, lazily created httpx.AsyncClient.
+
+    One pooled HTTP/2 client (TLS sessions, keep-alive connections) serves
+    every tool; pass timeout/follow_redirects per request to override the
+    defaults. Its cookie jar never stores anything, so cookies set by one
+    workflow's URL are never sent on another's requests.
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+        import httpx
+
+        _HTTP_CLIENT = httpx.AsyncClient(
+            http2=True,
+            timeout=15,
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+        )
+        register_shutdown(_close_http_client)
+    return _HTTP_CLIENT
+
+
+async def _close_http_client() -> None:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
 # Lazy registry to avoid heavy imports at startup
 _TOOL_MAP: dict[str, type[BaseTool]] | None = None
 
@@ -3,12 +3,20 @@
 from __future__ import annotations
 
 import asyncio
-import email as email_mod
 import imaplib
+from email.parser import BytesHeaderParser
 from typing import Any
 
 from tools import BaseTool
 
+# Header-only parser: stops at the header/body boundary
+_HDR_PARSER = BytesHeaderParser()
+
+
+def _imap_quote(value: str) -> str:
+    """Return *value* as an IMAP quoted string (RFC 3501 escaping)."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
 
 class EmailSearchTool(BaseTool):
     """Search emails across multiple backends."""
@@ -219,16 +227,36 @@ class EmailSearchTool(BaseTool):
             conn.login(username, password)
             conn.select("INBOX", readonly=True)
 
-            # IMAP search — OR across subject and body
-            safe_q = query.replace('"', "")
-            status, msg_ids = conn.search(
-                None, f'(OR SUBJECT "{safe_q}" BODY "{safe_q}")'
-            )
-            if status != "OK" or not msg_ids[0]:
-                return []
-
-            ids = msg_ids[0].split()[-max_results:]  # most recent last
-            ids.reverse()
+            def _criteria() -> tuple[str | None, str]:
+                """Return (charset, criteria) for an OR SUBJECT/BODY match."""
+                if query.isascii():
+                    q = _imap_quote(query)
+                    return None, f"(OR SUBJECT {q} BODY {q})"
+                # Non-ASCII can't go in a quoted string; send it as a UTF-8
+                # literal. imaplib allows a single literal per command, so
+                # search TEXT (headers + body) instead of OR SUBJECT/BODY.
+                conn.literal = query.encode("utf-8")
+                return "UTF-8", "TEXT"
+
+            # Prefer server-side SORT (RFC 5256): newest first, so only the
+            # top max_results IDs are kept instead of the whole mailbox.
+            ids: list[bytes] | None = None
+            if "SORT" in conn.capabilities:
+                charset, criteria = _criteria()
+                try:
+                    status, msg_ids = conn.sort("(REVERSE DATE)", charset or "UTF-8", criteria)
+                except imaplib.IMAP4.error:
+                    status, msg_ids = "NO", [None]
+                if status == "OK":
+                    ids = (msg_ids[0] or b"").split()[:max_results]
+
+            if ids is None:
+                charset, criteria = _criteria()
+                status, msg_ids = conn.search(charset, criteria)
+                if status != "OK" or not msg_ids[0]:
+                    return []
+                ids = msg_ids[0].split()[-max_results:]  # most recent last
+                ids.reverse()
 
             results: list[dict[str, Any]] = []
             for mid in ids:
@@ -237,7 +265,7 @@ class EmailSearchTool(BaseTool):
                     continue
                 raw = data[0][1]
                 if isinstance(raw, bytes):
-                    msg = email_mod.message_from_bytes(raw)
+                    msg = _HDR_PARSER.parsebytes(raw, headersonly=True)
                 else:
                     continue
                 results.append({
@@ -2,12 +2,248 @@
 
 from __future__ import annotations
 
-import smtplib
+import asyncio
+import functools
+import json
+import time
+from email import policy
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from email.utils import getaddresses
 from typing import Any
 
-from tools import BaseTool
+from tools import BaseTool, get_http_client, register_shutdown
+
+
+@functools.lru_cache(maxsize=16)
+def _build_mime(from_addr: str, subject: str, body: str) -> bytes:
+    """Serialize a message without its To header (cached).
+
+    Fan-out to many recipients reuses the same bytes; only the To line is
+    added per recipient by :func:`_with_to`.
+    """
+    msg = MIMEMultipart(policy=policy.SMTP)
+    if from_addr:
+        msg["From"] = from_addr
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body, "plain", "utf-8", policy=policy.SMTP))
+    return msg.as_bytes()
+
+
+def _with_to(mime: bytes, to: str) -> bytes:
+    """Prepend a To header to a message built by :func:`_build_mime`."""
+    header = policy.SMTP.header_factory("To", to)
+    return policy.SMTP.fold_binary("To", header) + mime
+
+
+# Authenticated aiosmtplib clients reused across sends, keyed by
+# (host, port, username). A per-key lock serializes use of each connection;
+# it is health-checked with NOOP before use and reopened if dropped.
+_SMTP_POOL: dict[tuple[str, int, str], Any] = {}
+_SMTP_LOCKS: dict[tuple[str, int, str], asyncio.Lock] = {}
+
+
+async def _smtp_send(
+    host: str, port: int, username: str, password: str, use_tls: bool,
+    recipients: list[str], message: bytes,
+) -> None:
+    """Send raw *message* over the pooled SMTP connection for (host, port, username)."""
+    import aiosmtplib
+
+    key = (host, port, username)
+    lock = _SMTP_LOCKS.setdefault(key, asyncio.Lock())
+    async with lock:
+        client = _SMTP_POOL.get(key)
+        if client is not None:
+            try:
+                await client.noop()
+            except (aiosmtplib.SMTPException, OSError):
+                client.close()
+                client = None
+        if client is None:
+            client = aiosmtplib.SMTP(
+                hostname=host,
+                port=port,
+                start_tls=use_tls,
+                username=username,
+                password=password,
+            )
+            await client.connect()
+            _SMTP_POOL[key] = client
+            register_shutdown(_close_smtp_pool)
+        try:
+            await client.sendmail(username, recipients, message)
+            await client.rset()
+        except (aiosmtplib.SMTPServerDisconnected, OSError):
+            # Connection dropped mid-send: don't hand it out again
+            _SMTP_POOL.pop(key, None)
+            client.close()
+            raise
+
+
+# Gmail API services keyed by token file: building one parses the whole
+# discovery document, so it's reused until its credentials expire.
+# Each entry is (service, credentials, lock serializing its requests).
+_GMAIL_SERVICES: dict[str, tuple[Any, Any, asyncio.Lock]] = {}
+
+
+# Microsoft Graph app tokens, keyed by (tenant, client_id) ->
+# (access_token, expires_at on the monotonic clock). Tokens live ~1h;
+# refresh them EXPIRATION_BUFFER seconds before they expire.
+_GRAPH_TOKENS: dict[tuple[str, str], tuple[str, float]] = {}
+EXPIRATION_BUFFER = 30
+
+
+async def _get_graph_token(tenant: str, client_id: str, client_secret: str) -> str:
+    """Return a cached Graph access token, requesting a new one only on expiry.
+
+    Raises RuntimeError with the provider's error description on failure.
+    """
+    key = (tenant, client_id)
+    cached = _GRAPH_TOKENS.get(key)
+    if cached and time.monotonic() < cached[1] - EXPIRATION_BUFFER:
+        return cached[0]
+
+    resp = await get_http_client().post(
+        f"https://login.microsoftonline.com/{tenant}/oauth2/v2.0/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "scope": "https://graph.microsoft.com/.default",
+        },
+    )
+    token_data = resp.json()
+    access_token = token_data.get("access_token")
+    if not access_token:
+        raise RuntimeError(token_data.get("error_description", "unknown"))
+    expires_in = float(token_data.get("expires_in", 3600))
+    _GRAPH_TOKENS[key] = (access_token, time.monotonic() + expires_in)
+    return access_token
+
+
+async def _close_smtp_pool() -> None:
+    for client in _SMTP_POOL.values():
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+    _SMTP_POOL.clear()
+
+
+_RESEND_NOT_CONFIGURED = (
+    "[Error] RESEND_API_KEY non configurata. "
+    "1) Registrati gratis su https://resend.com\n"
+    "2) Crea un API key\n"
+    "3) Aggiungi RESEND_API_KEY=re_xxxx nel file .env"
+)
+_GRAPH_NOT_CONFIGURED = (
+    "[Error] Microsoft Graph credentials not configured. Set MICROSOFT_TENANT_ID, "
+    "MICROSOFT_CLIENT_ID, MICROSOFT_CLIENT_SECRET, MICROSOFT_USER_ID in .env"
+)
+
+# Provider limits for a single batch request
+_RESEND_BATCH_SIZE = 100
+_GRAPH_BATCH_SIZE = 20
+
+
+class _TokenBucket:
+    """Async token bucket: at most *rate* sends per *per* seconds.
+
+    Adaptive: :meth:`throttle` (called on HTTP 429) pauses for the
+    provider's Retry-After and halves the rate; each later send that
+    completes outside a pause raises it by 10% back towards the limit.
+    """
+
+    def __init__(self, rate: float, per: float) -> None:
+        self._max_rate = rate / per  # tokens per second
+        self._rate = self._max_rate
+        self._capacity = max(1.0, rate)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "_TokenBucket":
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return self
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    async def __aexit__(self, exc_type: Any, *_: Any) -> None:
+        if exc_type is None and time.monotonic() >= self._paused_until:
+            self._rate = min(self._max_rate, self._rate * 1.1)
+
+    def throttle(self, retry_after: float | None = None) -> None:
+        """Back off after the provider rejected a send as rate-limited."""
+        self._rate = max(self._max_rate / 10, self._rate / 2)
+        pause = retry_after if retry_after is not None else 1 / self._rate
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+
+# Per-provider send limits: (requests, per seconds)
+_LIMITS: dict[str, tuple[float, float]] = {
+    "resend": (2, 1.0),
+    "gmail": (20, 1.0),
+    "outlook": (50, 1.0),
+    "smtp": (5, 1.0),
+}
+_BUCKETS: dict[str, _TokenBucket] = {}
+
+
+def _bucket(source: str) -> _TokenBucket:
+    bucket = _BUCKETS.get(source)
+    if bucket is None:
+        bucket = _BUCKETS[source] = _TokenBucket(*_LIMITS[source])
+    return bucket
+
+
+def _retry_after(resp: Any) -> float | None:
+    """Seconds from a response's Retry-After header, if given as a number."""
+    return _retry_after_value(resp.headers.get("Retry-After"))
+
+
+def _retry_after_value(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _json_body(payload: Any) -> bytes:
+    """Encode a request body as JSON bytes (orjson when available)."""
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(payload, ensure_ascii=False).encode()
+    return orjson.dumps(payload)
+
+
+def _resend_error(resp: Any) -> str:
+    try:
+        msg = resp.json().get("message", resp.text[:300])
+    except Exception:
+        msg = resp.text[:300]
+    return f"[Error] Resend returned {resp.status_code}: {msg}"
+
+
+def _graph_message(to: str, subject: str, body: str) -> dict[str, Any]:
+    """Build a Graph sendMail payload."""
+    return {
+        "message": {
+            "subject": subject,
+            "body": {"contentType": "Text", "content": body},
+            "toRecipients": [{"emailAddress": {"address": addr.strip()}} for addr in to.split(",")],
+        }
+    }
 
 
 class EmailSenderTool(BaseTool):
@@ -42,47 +278,120 @@ class EmailSenderTool(BaseTool):
         except Exception as e:
             return f"[Email error] {e}"
 
+    async def execute_batch(self, items: list[dict[str, Any]], **kwargs: Any) -> str:
+        """Send many emails at once. Each item is ``{"to", "subject", "body"}``.
+
+        Resend and Outlook pack the items into their batch endpoints
+        (100 and 20 per request). Gmail and SMTP send them one at a time
+        over a shared service / pooled connection, whose lock serializes
+        the sends.
+        """
+        source = kwargs.get("source", "smtp")
+        default_subject = kwargs.get("subject", "Gennaro Workflow Result")
+
+        batch: list[dict[str, str]] = []
+        for i, item in enumerate(items, 1):
+            to = item.get("to", "")
+            body = (item.get("body") or "").strip()
+            if not to:
+                return f"[Error] Item {i}: no recipient (to) address provided."
+            if not body:
+                return f"[Error] Item {i}: no email body provided."
+            batch.append({"to": to, "subject": item.get("subject") or default_subject, "body": body})
+
+        if not batch:
+            return "[Error] No emails to send."
+
+        try:
+            if source == "resend":
+                return await self._send_resend_batch(batch)
+            if source == "outlook":
+                return await self._send_outlook_batch(batch)
+            if source == "gmail":
+                sends = [self._send_gmail(m["to"], m["subject"], m["body"]) for m in batch]
+            else:
+                smtp_kwargs = {k: v for k, v in kwargs.items() if k not in ("to", "subject", "source")}
+                sends = [self._send_smtp(m["to"], m["subject"], m["body"], **smtp_kwargs) for m in batch]
+            outcomes = await asyncio.gather(*sends, return_exceptions=True)
+        except Exception as e:
+            return f"[Email error] {e}"
+
+        lines = [
+            f"[Email error] {o}" if isinstance(o, BaseException) else o
+            for o in outcomes
+        ]
+        return "\n".join(lines)
+
     async def _send_resend(self, to: str, subject: str, body: str) -> str:
         """Send via Resend API (https://resend.com). Only needs an API key."""
-        import httpx
         from config import settings
 
         api_key = settings.resend_api_key
         if not api_key:
-            return (
-                "[Error] RESEND_API_KEY non configurata. "
-                "1) Registrati gratis su https://resend.com\n"
-                "2) Crea un API key\n"
-                "3) Aggiungi RESEND_API_KEY=re_xxxx nel file .env"
-            )
+            return _RESEND_NOT_CONFIGURED
 
         from_addr = settings.resend_from or "Gennaro <onboarding@resend.dev>"
         recipients = [addr.strip() for addr in to.split(",")]
 
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(
+        bucket = _bucket("resend")
+        async with bucket:
+            resp = await get_http_client().post(
                 "https://api.resend.com/emails",
                 headers={
                     "Authorization": f"Bearer {api_key}",
                     "Content-Type": "application/json",
                 },
-                json={
+                content=_json_body({
                     "from": from_addr,
                     "to": recipients,
                     "subject": subject,
                     "text": body,
-                },
+                }),
             )
+            if resp.status_code == 429:
+                bucket.throttle(_retry_after(resp))
 
         if resp.status_code == 200:
             return f"Email inviata via Resend a {to}"
+        return _resend_error(resp)
 
-        try:
-            err = resp.json()
-            msg = err.get("message", resp.text[:300])
-        except Exception:
-            msg = resp.text[:300]
-        return f"[Error] Resend returned {resp.status_code}: {msg}"
+    async def _send_resend_batch(self, batch: list[dict[str, str]]) -> str:
+        """Send via Resend's batch endpoint, up to 100 emails per request."""
+        from config import settings
+
+        api_key = settings.resend_api_key
+        if not api_key:
+            return _RESEND_NOT_CONFIGURED
+
+        from_addr = settings.resend_from or "Gennaro <onboarding@resend.dev>"
+        client = get_http_client()
+        bucket = _bucket("resend")
+        sent = 0
+        for start in range(0, len(batch), _RESEND_BATCH_SIZE):
+            chunk = batch[start:start + _RESEND_BATCH_SIZE]
+            async with bucket:
+                resp = await client.post(
+                    "https://api.resend.com/emails/batch",
+                    headers={
+                        "Authorization": f"Bearer {api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    content=_json_body([
+                        {
+                            "from": from_addr,
+                            "to": [addr.strip() for addr in m["to"].split(",")],
+                            "subject": m["subject"],
+                            "text": m["body"],
+                        }
+                        for m in chunk
+                    ]),
+                )
+                if resp.status_code == 429:
+                    bucket.throttle(_retry_after(resp))
+            if resp.status_code != 200:
+                return f"{_resend_error(resp)} (after {sent} of {len(batch)} sent)"
+            sent += len(chunk)
+        return f"{sent} email inviate via Resend"
 
     async def _send_gmail(self, to: str, subject: str, body: str) -> str:
         """Send via Gmail API using OAuth2 credentials."""
@@ -102,29 +411,32 @@ class EmailSenderTool(BaseTool):
         if not creds_path or not token_path:
             return "[Error] Gmail credentials not configured. Set GMAIL_CREDENTIALS_JSON and GMAIL_TOKEN_JSON in .env"
 
-        try:
-            creds = Credentials.from_authorized_user_file(token_path)
-        except Exception as e:
-            return f"[Error] Failed to load Gmail token: {e}"
-
-        service = build("gmail", "v1", credentials=creds)
-
-        msg = MIMEMultipart()
-        msg["to"] = to
-        msg["subject"] = subject
-        msg.attach(MIMEText(body, "plain", "utf-8"))
-
-        raw = base64.urlsafe_b64encode(msg.as_bytes()).decode()
-        service.users().messages().send(
-            userId="me", body={"raw": raw}
-        ).execute()
+        cached = _GMAIL_SERVICES.get(token_path)
+        if cached is None or cached[1].expired:
+            try:
+                creds = Credentials.from_authorized_user_file(token_path)
+            except Exception as e:
+                return f"[Error] Failed to load Gmail token: {e}"
+            # Bundled discovery document: no discovery HTTP round trip
+            service = build("gmail", "v1", credentials=creds, cache_discovery=False)
+            cached = (service, creds, asyncio.Lock())
+            _GMAIL_SERVICES[token_path] = cached
+        service, _, lock = cached
+
+        message = _with_to(_build_mime("", subject, body), to)
+        # Gmail accepts unpadded base64url
+        raw = base64.urlsafe_b64encode(message).rstrip(b"=").decode("ascii")
+        request = service.users().messages().send(userId="me", body={"raw": raw})
+        # The service's HTTP transport isn't thread-safe: one request at a time
+        async with _bucket("gmail"), lock:
+            await asyncio.to_thread(request.execute)
 
         return f"Email sent via Gmail to {to}"
 
     async def _send_outlook(self, to: str, subject: str, body: str) -> str:
         """Send via Microsoft Graph API."""
         try:
-            import httpx
+            import httpx  # noqa: F401
         except ImportError:
             return "[Error] httpx not installed."
 
@@ -136,39 +448,86 @@ class EmailSenderTool(BaseTool):
         user_id = settings.microsoft_user_id
 
         if not all([tenant, client_id, client_secret, user_id]):
-            return "[Error] Microsoft Graph credentials not configured. Set MICROSOFT_TENANT_ID, MICROSOFT_CLIENT_ID, MICROSOFT_CLIENT_SECRET, MICROSOFT_USER_ID in .env"
-
-        # Get access token
-        async with httpx.AsyncClient() as client:
-            token_resp = await client.post(
-                f"https://login.microsoftonline.com/{tenant}/oauth2/v2.0/token",
-                data={
-                    "grant_type": "client_credentials",
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "scope": "https://graph.microsoft.com/.default",
-                },
-            )
-            token_data = token_resp.json()
-            access_token = token_data.get("access_token")
-            if not access_token:
-                return f"[Error] Failed to get Microsoft token: {token_data.get('error_description', 'unknown')}"
+            return _GRAPH_NOT_CONFIGURED
 
-            # Send email
-            resp = await client.post(
+        try:
+            access_token = await _get_graph_token(tenant, client_id, client_secret)
+        except RuntimeError as e:
+            return f"[Error] Failed to get Microsoft token: {e}"
+
+        # Send email
+        bucket = _bucket("outlook")
+        async with bucket:
+            resp = await get_http_client().post(
                 f"https://graph.microsoft.com/v1.0/users/{user_id}/sendMail",
                 headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
-                json={
-                    "message": {
-                        "subject": subject,
-                        "body": {"contentType": "Text", "content": body},
-                        "toRecipients": [{"emailAddress": {"address": addr.strip()}} for addr in to.split(",")],
-                    }
-                },
+                content=_json_body(_graph_message(to, subject, body)),
             )
-            if resp.status_code in (200, 202):
-                return f"Email sent via Outlook to {to}"
-            return f"[Error] Microsoft Graph returned {resp.status_code}: {resp.text}"
+            if resp.status_code == 429:
+                bucket.throttle(_retry_after(resp))
+        if resp.status_code in (200, 202):
+            return f"Email sent via Outlook to {to}"
+        if resp.status_code == 401:
+            # Token revoked or rotated early: fetch a fresh one next time
+            _GRAPH_TOKENS.pop((tenant, client_id), None)
+        return f"[Error] Microsoft Graph returned {resp.status_code}: {resp.text}"
+
+    async def _send_outlook_batch(self, batch: list[dict[str, str]]) -> str:
+        """Send via Graph JSON batching, up to 20 sendMail requests per call."""
+        from config import settings
+
+        tenant = settings.microsoft_tenant_id
+        client_id = settings.microsoft_client_id
+        client_secret = settings.microsoft_client_secret
+        user_id = settings.microsoft_user_id
+
+        if not all([tenant, client_id, client_secret, user_id]):
+            return _GRAPH_NOT_CONFIGURED
+
+        try:
+            access_token = await _get_graph_token(tenant, client_id, client_secret)
+        except RuntimeError as e:
+            return f"[Error] Failed to get Microsoft token: {e}"
+
+        client = get_http_client()
+        bucket = _bucket("outlook")
+        sent = 0
+        errors: list[str] = []
+        for start in range(0, len(batch), _GRAPH_BATCH_SIZE):
+            chunk = batch[start:start + _GRAPH_BATCH_SIZE]
+            async with bucket:
+                resp = await client.post(
+                    "https://graph.microsoft.com/v1.0/$batch",
+                    headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
+                    content=_json_body({
+                        "requests": [
+                            {
+                                "id": str(start + i),
+                                "method": "POST",
+                                "url": f"/users/{user_id}/sendMail",
+                                "headers": {"Content-Type": "application/json"},
+                                "body": _graph_message(m["to"], m["subject"], m["body"]),
+                            }
+                            for i, m in enumerate(chunk)
+                        ]
+                    }),
+                )
+                if resp.status_code == 429:
+                    bucket.throttle(_retry_after(resp))
+            if resp.status_code == 401:
+                _GRAPH_TOKENS.pop((tenant, client_id), None)
+            if resp.status_code != 200:
+                return f"[Error] Microsoft Graph returned {resp.status_code}: {resp.text} (after {sent} of {len(batch)} sent)"
+            for r in resp.json().get("responses", []):
+                if r.get("status") in (200, 202):
+                    sent += 1
+                else:
+                    if r.get("status") == 429:
+                        bucket.throttle(_retry_after_value(r.get("headers", {}).get("Retry-After")))
+                    to = batch[int(r.get("id", 0))]["to"]
+                    errors.append(f"[Error] {to}: Microsoft Graph returned {r.get('status')}")
+
+        return "\n".join([f"{sent} email(s) sent via Outlook", *errors])
 
     async def _send_smtp(self, to: str, subject: str, body: str, **kwargs: Any) -> str:
         """Send via generic SMTP (works with any provider)."""
@@ -185,21 +544,13 @@ class EmailSenderTool(BaseTool):
         if not username or not password:
             return "[Error] SMTP credentials not configured. Set smtp_username/smtp_password in node config or IMAP_USERNAME/IMAP_PASSWORD in .env"
 
-        msg = MIMEMultipart()
-        msg["From"] = username
-        msg["To"] = to
-        msg["Subject"] = subject
-        msg.attach(MIMEText(body, "plain", "utf-8"))
-
-        import asyncio
-        loop = asyncio.get_event_loop()
-
-        def _do_send() -> str:
-            with smtplib.SMTP(host, port) as server:
-                if use_tls:
-                    server.starttls()
-                server.login(username, password)
-                server.send_message(msg)
-            return f"Email sent via SMTP ({host}) to {to}"
+        try:
+            import aiosmtplib  # noqa: F401
+        except ImportError:
+            return "[Error] aiosmtplib not installed. Run: pip install aiosmtplib"
 
-        return await loop.run_in_executor(None, _do_send)
+        message = _with_to(_build_mime(username, subject, body), to)
+        recipients = [addr for _, addr in getaddresses([to]) if addr]
+        async with _bucket("smtp"):
+            await _smtp_send(host, port, username, password, use_tls, recipients, message)
+        return f"Email sent via SMTP ({host}) to {to}"
@@ -2,15 +2,64 @@
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+import io
 import os
 import re
 import shutil
-from datetime import datetime, timezone
+import time
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import aiofiles
+
 from tools import BaseTool
 
+# _auto_slug: markdown/special chars to drop, then anything not slug-safe
+_SLUG_STRIP = re.compile(r'[#*`\[\](){}]')
+_SLUG_KEEP = re.compile(r'[^a-zA-Z0-9À-ÿ\s-]')
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
+def _format_utc(timestamp: float, seconds: bool = False) -> str:
+    """Format a POSIX timestamp as ``YYYY-MM-DD HH:MM[:SS]`` in UTC.
+
+    Plain integer formatting of time.gmtime() — no datetime/tzinfo objects
+    or strftime() per row.
+    """
+    t = time.gmtime(timestamp)
+    text = f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}"
+    return f"{text}:{t.tm_sec:02d}" if seconds else text
+
+
+def _fast_copy_file(src: str, dst: str) -> str:
+    """Copy a file in-kernel with copy_file_range(2), preserving metadata.
+
+    On same-filesystem copies this can reflink (CoW) instead of moving
+    bytes. Falls back to shutil.copy2 where the syscall is unavailable or
+    refused (e.g. cross-device on older kernels, non-Linux platforms).
+    """
+    copy_range = getattr(os, "copy_file_range", None)
+    if copy_range is None:
+        return shutil.copy2(src, dst)
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = copy_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except OSError:
+        return shutil.copy2(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
 
 class FileManagerTool(BaseTool):
     """Manage local files: create folders, write/read, copy, move, delete, list."""
@@ -40,17 +89,17 @@ class FileManagerTool(BaseTool):
             base = Path(base_dir).resolve()
             if target:
                 resolved = (base / target).resolve()
-                if not str(resolved).startswith(str(base)):
+                if not resolved.is_relative_to(base):
                     return f"[file_manager] Path traversal blocked: {target} is outside base dir {base_dir}"
                 target = str(resolved)
             if destination:
                 dest_resolved = (base / destination).resolve()
-                if not str(dest_resolved).startswith(str(base)):
+                if not dest_resolved.is_relative_to(base):
                     return f"[file_manager] Path traversal blocked: destination is outside base dir {base_dir}"
                 destination = str(dest_resolved)
 
         if operation == "list":
-            return self._list_dir(target or ".")
+            return await asyncio.to_thread(self._list_dir, target or ".")
         if operation == "create_folder":
             # Prefer destination config, then target if it looks like a path,
             # then auto-generate a short name from input content
@@ -69,17 +118,17 @@ class FileManagerTool(BaseTool):
                 # Auto-generate a filename from content
                 slug = self._auto_slug(input_text)
                 file_path = f"./output/{slug}.md"
-            return self._write_file(file_path, content)
+            return await self._write_file(file_path, content)
         if operation == "read_file":
-            return self._read_file(target)
+            return await self._read_file(target)
         if operation == "copy":
-            return self._copy(target, destination)
+            return await asyncio.to_thread(self._copy, target, destination)
         if operation == "move":
-            return self._move(target, destination)
+            return await asyncio.to_thread(self._move, target, destination)
         if operation == "delete":
-            return self._delete(target, confirm)
+            return await asyncio.to_thread(self._delete, target, confirm)
         if operation == "info":
-            return self._info(target)
+            return await asyncio.to_thread(self._info, target)
 
         return f"[file_manager] Unknown operation: {operation}"
 
@@ -91,30 +140,34 @@ class FileManagerTool(BaseTool):
         if not p.is_dir():
             return f"[file_manager] Not a directory: {path}"
 
-        entries = sorted(p.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
+        with os.scandir(p) as it:
+            entries = list(it)
         if not entries:
             return f"Directory `{path}` is empty."
 
-        lines = [
-            f"Contents of `{p.resolve()}` ({len(entries)} items)\n",
-            "| Type | Name | Size | Modified |",
-            "| --- | --- | --- | --- |",
-        ]
+        # DirEntry.is_dir() uses the type from the directory read, and only
+        # the 200 entries shown are sorted/stat'ed.
+        shown = heapq.nsmallest(200, entries, key=lambda e: (not e.is_dir(), e.name.lower()))
+
+        buf = io.StringIO()
+        buf.write(f"Contents of `{p.resolve()}` ({len(entries)} items)\n\n")
+        buf.write("| Type | Name | Size | Modified |\n")
+        buf.write("| --- | --- | --- | --- |")
 
-        for entry in entries[:200]:
+        for entry in shown:
             try:
                 stat = entry.stat()
                 etype = "DIR" if entry.is_dir() else "FILE"
                 size = self._format_size(stat.st_size) if entry.is_file() else "-"
-                mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
-                lines.append(f"| {etype} | {entry.name} | {size} | {mtime} |")
+                mtime = _format_utc(stat.st_mtime)
+                buf.write(f"\n| {etype} | {entry.name} | {size} | {mtime} |")
             except OSError:
-                lines.append(f"| ? | {entry.name} | - | - |")
+                buf.write(f"\n| ? | {entry.name} | - | - |")
 
         if len(entries) > 200:
-            lines.append(f"\n... ({len(entries) - 200} more entries)")
+            buf.write(f"\n\n... ({len(entries) - 200} more entries)")
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
     def _create_folder(self, path: str) -> str:
         """Create a directory (with parents)."""
@@ -127,19 +180,20 @@ class FileManagerTool(BaseTool):
         except OSError as e:
             return f"[file_manager] Error creating directory: {e}"
 
-    def _write_file(self, path: str, content: str) -> str:
+    async def _write_file(self, path: str, content: str) -> str:
         """Write content to a file."""
         if not path:
             return "[file_manager] No file path provided for write_file. Set destination in config."
         p = Path(path)
         try:
             p.parent.mkdir(parents=True, exist_ok=True)
-            p.write_text(content, encoding="utf-8")
+            async with aiofiles.open(p, "w", encoding="utf-8") as f:
+                await f.write(content)
             return f"File written: `{p.resolve()}` ({len(content)} chars, {self._format_size(len(content.encode('utf-8')))})"
         except OSError as e:
             return f"[file_manager] Error writing file: {e}"
 
-    def _read_file(self, path: str) -> str:
+    async def _read_file(self, path: str) -> str:
         """Read content of a file."""
         if not path:
             return "[file_manager] No path provided for read_file."
@@ -149,9 +203,13 @@ class FileManagerTool(BaseTool):
         if not p.is_file():
             return f"[file_manager] Not a file: {path}"
         try:
-            content = p.read_text(encoding="utf-8", errors="replace")
+            # Read one char past the cap to detect truncation without
+            # loading the whole file
+            async with aiofiles.open(p, "r", encoding="utf-8", errors="replace") as f:
+                content = await f.read(50_001)
             if len(content) > 50_000:
-                content = content[:50_000] + f"\n\n... (truncated, {len(content)} total chars)"
+                size = self._format_size(p.stat().st_size)
+                content = content[:50_000] + f"\n\n... (truncated at 50000 chars, file size {size})"
             return content
         except OSError as e:
             return f"[file_manager] Error reading file: {e}"
@@ -166,10 +224,10 @@ class FileManagerTool(BaseTool):
             return f"[file_manager] Source not found: {source}"
         try:
             if src.is_dir():
-                shutil.copytree(str(src), str(dst))
+                shutil.copytree(str(src), str(dst), copy_function=_fast_copy_file)
             else:
                 dst.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(str(src), str(dst))
+                _fast_copy_file(str(src), str(dst))
             return f"Copied: `{src}` -> `{dst.resolve()}`"
         except OSError as e:
             return f"[file_manager] Error copying: {e}"
@@ -222,14 +280,15 @@ class FileManagerTool(BaseTool):
                 f"**{etype}:** `{p.resolve()}`",
                 f"**Name:** {p.name}",
                 f"**Size:** {self._format_size(stat.st_size)}",
-                f"**Modified:** {datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}",
-                f"**Created:** {datetime.fromtimestamp(stat.st_ctime, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}",
+                f"**Modified:** {_format_utc(stat.st_mtime, seconds=True)} UTC",
+                f"**Created:** {_format_utc(stat.st_ctime, seconds=True)} UTC",
                 f"**Permissions:** {oct(stat.st_mode)[-3:]}",
             ]
             if p.is_file():
                 lines.append(f"**Extension:** {p.suffix or '(none)'}")
             if p.is_dir():
-                count = sum(1 for _ in p.iterdir())
+                with os.scandir(p) as it:
+                    count = sum(1 for _ in it)
                 lines.append(f"**Items:** {count}")
             return "\n".join(lines)
         except OSError as e:
@@ -243,11 +302,10 @@ class FileManagerTool(BaseTool):
         Falls back to a timestamp-based name if text is empty or non-alphanumeric.
         """
         # Take first 60 chars of the first line
-        first_line = text.strip().split("\n")[0][:60] if text.strip() else ""
-        # Remove markdown headers, special chars
-        clean = re.sub(r'[#*`\[\](){}]', '', first_line)
-        # Keep only alphanumeric, spaces, hyphens
-        clean = re.sub(r'[^a-zA-Z0-9À-ÿ\s-]', '', clean).strip()
+        first_line = text.strip().split("\n", 1)[0][:60]
+        # Remove markdown headers, special chars; keep only alphanumeric,
+        # spaces, hyphens
+        clean = _SLUG_KEEP.sub('', _SLUG_STRIP.sub('', first_line)).strip()
         # Take first 4 words
         words = clean.split()[:4]
         if not words:
@@ -279,8 +337,8 @@ class FileManagerTool(BaseTool):
     @staticmethod
     def _format_size(size: int) -> str:
         """Format byte size to human-readable string."""
-        for unit in ("B", "KB", "MB", "GB"):
-            if size < 1024:
-                return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
-            size /= 1024
-        return f"{size:.1f} TB"
+        if size < 1024:
+            return f"{size} B"
+        # Unit index straight from the bit length: 2**10 per step, capped at TB
+        unit = min((size.bit_length() - 1) // 10, 4)
+        return f"{size / (1 << (unit * 10)):.1f} {_SIZE_UNITS[unit]}"
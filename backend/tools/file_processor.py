@@ -2,13 +2,153 @@
 
 from __future__ import annotations
 
+import asyncio
 import csv
 import io
+import itertools
 import json
+from contextlib import closing
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-from tools import BaseTool
+from tools import PROCESS_POOL_WORKERS, BaseTool, get_process_pool
+
+# Stop extracting PDF pages once this much text has been collected
+_PDF_TEXT_BUDGET = 50_000
+
+_JSON_PREVIEW_CHARS = 10_000
+# Above this size JSON is pretty-printed from a stream (ijson) instead of
+# being loaded whole, since only the first _JSON_PREVIEW_CHARS are shown.
+_JSON_STREAM_BYTES = 1_000_000
+
+
+def _iter_pdf_pages(path: Path, start: int = 0, stop: int | None = None) -> Iterator[str]:
+    """Yield the text of PDF pages ``[start, stop)``, lazily.
+
+    Uses pypdfium2 (PDFium, native) when installed, else PyPDF2.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        from PyPDF2 import PdfReader
+
+        pages = PdfReader(str(path)).pages
+        for i in range(start, len(pages) if stop is None else min(stop, len(pages))):
+            yield pages[i].extract_text() or ""
+        return
+
+    doc = pdfium.PdfDocument(str(path))
+    try:
+        for i in range(start, len(doc) if stop is None else min(stop, len(doc))):
+            page = doc[i]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range().replace("\r\n", "\n")
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        doc.close()
+
+
+def _pdf_page_count(path: Path) -> int:
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        from PyPDF2 import PdfReader
+
+        return len(PdfReader(str(path)).pages)
+    doc = pdfium.PdfDocument(str(path))
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+def _extract_pdf_range(path: str, start: int, stop: int) -> list[str]:
+    """Process-pool worker: text of pages ``[start, stop)``."""
+    with closing(_iter_pdf_pages(Path(path), start, stop)) as page_texts:
+        return list(page_texts)
+
+
+# Page extraction is CPU-bound (and PyPDF2 is pure Python), so large PDFs
+# are split into page ranges across the shared process pool.
+_PDF_PARALLEL_MIN_PAGES = 16
+_PDF_PAGES_PER_TASK = 8
+
+
+def _iter_pdf_pages_parallel(path: Path) -> Iterator[str]:
+    """Like :func:`_iter_pdf_pages`, but extracts large PDFs in parallel.
+
+    Pages are submitted one wave (a page range per worker) at a time and
+    yielded in order, so a caller that stops early doesn't pay for the
+    rest of the document.
+    """
+    n_pages = _pdf_page_count(path)
+    pool = get_process_pool()
+    if n_pages < _PDF_PARALLEL_MIN_PAGES or pool is None:
+        yield from _iter_pdf_pages(path)
+        return
+
+    wave = _PDF_PAGES_PER_TASK * PROCESS_POOL_WORKERS
+    for wave_start in range(0, n_pages, wave):
+        futures = [
+            pool.submit(_extract_pdf_range, str(path), s, min(s + _PDF_PAGES_PER_TASK, n_pages))
+            for s in range(wave_start, min(wave_start + wave, n_pages), _PDF_PAGES_PER_TASK)
+        ]
+        try:
+            for fut in futures:
+                yield from fut.result()
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+
+def _json_preview_stream(f: Any, limit: int) -> tuple[str, bool]:
+    """Pretty-print JSON from a binary stream, stopping after *limit* chars.
+
+    Produces the same layout as ``json.dumps(indent=2, ensure_ascii=False)``.
+    Returns ``(text, truncated)``.
+    """
+    import ijson
+
+    buf = io.StringIO()
+    depth = 0
+    first = True       # next item is the first one in the current container
+    after_key = False  # next value directly follows a "key": prefix
+    for _prefix, event, value in ijson.parse(f):
+        if event in ("end_map", "end_array"):
+            depth -= 1
+            if not first:
+                buf.write("\n" + "  " * depth)
+            buf.write("}" if event == "end_map" else "]")
+            first = False
+        else:
+            if after_key:
+                after_key = False
+            elif depth:
+                buf.write(("\n" if first else ",\n") + "  " * depth)
+            first = False
+            if event == "map_key":
+                buf.write(json.dumps(value, ensure_ascii=False) + ": ")
+                after_key = True
+            elif event in ("start_map", "start_array"):
+                buf.write("{" if event == "start_map" else "[")
+                depth += 1
+                first = True
+            elif event == "string":
+                buf.write(json.dumps(value, ensure_ascii=False))
+            elif event == "boolean":
+                buf.write("true" if value else "false")
+            elif event == "null":
+                buf.write("null")
+            elif isinstance(value, int):
+                buf.write(str(value))
+            else:  # Decimal: spelled as json.dumps spells the float
+                buf.write(json.dumps(float(value)))
+        if buf.tell() > limit:
+            return buf.getvalue(), True
+    return buf.getvalue(), False
 
 
 class FileProcessorTool(BaseTool):
@@ -22,7 +162,7 @@ class FileProcessorTool(BaseTool):
         path = input_text.strip()
         p = Path(path)
         if p.exists() and p.is_file():
-            return self._process_file(p)
+            return await asyncio.to_thread(self._process_file, p)
         # Treat as raw text
         return f"Text content ({len(input_text)} characters):\n{input_text[:5000]}"
 
@@ -44,13 +184,17 @@ class FileProcessorTool(BaseTool):
 
     def _process_pdf(self, path: Path) -> str:
         try:
-            from PyPDF2 import PdfReader
-            reader = PdfReader(str(path))
             pages = []
-            for i, page in enumerate(reader.pages):
-                text = page.extract_text() or ""
-                if text.strip():
+            total = 0
+            with closing(_iter_pdf_pages_parallel(path)) as page_texts:
+                for i, text in enumerate(page_texts):
+                    if not text.strip():
+                        continue
                     pages.append(f"--- Page {i + 1} ---\n{text}")
+                    total += len(text)
+                    if total > _PDF_TEXT_BUDGET:
+                        pages.append(f"... (truncated after page {i + 1}, text budget reached)")
+                        break
             return "\n\n".join(pages) if pages else "No text extracted from PDF."
         except ImportError:
             return "PyPDF2 not installed. Cannot process PDF files."
@@ -69,29 +213,54 @@ class FileProcessorTool(BaseTool):
 
     def _process_csv(self, path: Path) -> str:
         try:
-            text = path.read_text(errors="replace")
-            reader = csv.reader(io.StringIO(text))
-            rows = list(reader)
-            if not rows:
-                return "Empty CSV file."
-            # Format as markdown table
-            header = rows[0]
-            lines = ["| " + " | ".join(header) + " |"]
-            lines.append("| " + " | ".join(["---"] * len(header)) + " |")
-            for row in rows[1:50]:  # limit to 50 rows
-                lines.append("| " + " | ".join(row) + " |")
-            if len(rows) > 51:
-                lines.append(f"\n... ({len(rows) - 51} more rows)")
-            return "\n".join(lines)
+            # Stream rows from the file straight into the markdown buffer:
+            # only the first 50 are rendered, the rest are just counted.
+            buf = io.StringIO()
+            with path.open(newline="", errors="replace") as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if header is None:
+                    return "Empty CSV file."
+                # Format as markdown table
+                buf.write("| " + " | ".join(header) + " |\n")
+                buf.write("| " + " | ".join(["---"] * len(header)) + " |")
+                for row in itertools.islice(reader, 50):  # limit to 50 rows
+                    buf.write("\n| " + " | ".join(row) + " |")
+                remaining = sum(1 for _ in reader)
+            if remaining:
+                buf.write(f"\n\n... ({remaining} more rows)")
+            return buf.getvalue()
         except Exception as e:
             return f"CSV processing error: {e}"
 
     def _process_json(self, path: Path) -> str:
         try:
-            data = json.loads(path.read_text(errors="replace"))
-            formatted = json.dumps(data, indent=2, ensure_ascii=False)
-            if len(formatted) > 10000:
-                return formatted[:10000] + "\n... (truncated)"
+            if path.stat().st_size > _JSON_STREAM_BYTES:
+                try:
+                    with path.open("rb") as f:
+                        formatted, truncated = _json_preview_stream(f, _JSON_PREVIEW_CHARS)
+                    if truncated:
+                        return formatted[:_JSON_PREVIEW_CHARS] + "\n... (truncated)"
+                    return formatted
+                except ImportError:
+                    pass  # ijson not installed: load the whole file below
+            formatted = _json_pretty(path.read_bytes())
+            if len(formatted) > _JSON_PREVIEW_CHARS:
+                return formatted[:_JSON_PREVIEW_CHARS] + "\n... (truncated)"
             return formatted
         except Exception as e:
             return f"JSON processing error: {e}"
+
+
+def _json_pretty(raw: bytes) -> str:
+    """Parse and re-indent JSON bytes, using orjson when available."""
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(json.loads(raw.decode(errors="replace")), indent=2, ensure_ascii=False)
+    try:
+        return orjson.dumps(orjson.loads(raw), option=orjson.OPT_INDENT_2).decode()
+    except (orjson.JSONDecodeError, orjson.JSONEncodeError):
+        # orjson rejects some inputs the stdlib accepts (invalid UTF-8,
+        # NaN, >64-bit ints on encode)
+        return json.dumps(json.loads(raw.decode(errors="replace")), indent=2, ensure_ascii=False)
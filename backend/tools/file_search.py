@@ -3,11 +3,22 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
+import functools
+import io
+import itertools
+import locale
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
-from tools import BaseTool
+from tools import BaseTool, get_http_client, get_process_pool
 
 
 class FileSearchTool(BaseTool):
@@ -63,10 +74,12 @@ class FileSearchTool(BaseTool):
         else:
             roots = [r.strip() for r in roots_str.split(",") if r.strip()]
 
-        # Run blocking I/O in thread
-        results = await asyncio.to_thread(
-            self._local_search_sync, query, roots, max_results
-        )
+        # Walk each root in its own thread so a slow disk doesn't hold up the rest
+        per_root = await asyncio.gather(*(
+            asyncio.to_thread(self._local_search_sync, query, [root], max_results)
+            for root in roots
+        ))
+        results = list(itertools.chain.from_iterable(per_root))[:max_results]
         return self._format_results("Local", query, results)
 
     @staticmethod
@@ -75,35 +88,29 @@ class FileSearchTool(BaseTool):
     ) -> list[dict[str, Any]]:
         """Synchronous local file search (runs in thread)."""
         results: list[dict[str, Any]] = []
-        q = query.lower()
+        q = query.casefold()
 
         for root in roots:
-            root_path = Path(root)
-            if not root_path.exists():
-                continue
-            try:
-                for p in root_path.rglob("*"):
-                    if len(results) >= max_results:
-                        break
-                    if not p.is_file():
-                        continue
-                    if q in p.name.lower():
+            # closing() shuts the open scandir handle as soon as we return
+            with closing(_iter_files(root)) as entries:
+                for entry in entries:
+                    name = entry.name
+                    # Try the name as-is first: no casefolded copy when it hits
+                    if q in name or q in name.casefold():
                         try:
-                            stat = p.stat()
-                            results.append({
-                                "name": p.name,
-                                "path": str(p),
-                                "size": stat.st_size,
-                                "modified": datetime.fromtimestamp(
-                                    stat.st_mtime, tz=timezone.utc
-                                ).isoformat(),
-                            })
+                            stat = entry.stat()
                         except OSError:
                             continue
-            except PermissionError:
-                continue
-            if len(results) >= max_results:
-                break
+                        results.append({
+                            "name": name,
+                            "path": entry.path,
+                            "size": stat.st_size,
+                            "modified": datetime.fromtimestamp(
+                                stat.st_mtime, tz=timezone.utc
+                            ).isoformat(),
+                        })
+                        if len(results) >= max_results:
+                            return results  # don't read another entry
 
         return results
 
@@ -114,6 +121,8 @@ class FileSearchTool(BaseTool):
 
         Recursively walks all subdirectories, extracts text from supported
         file types, and returns files + relevant excerpts where the query appears.
+        A ``queries`` kwarg (list, or one query per line) searches several
+        queries in one pass over the documents, with one report per query.
         """
         from config import settings
 
@@ -131,34 +140,61 @@ class FileSearchTool(BaseTool):
         else:
             roots = [r.strip() for r in roots_str.split(",") if r.strip()]
 
-        results = await asyncio.to_thread(
-            self._content_search_sync, query, roots, ext_set, max_results
-        )
+        # Several queries (list or one per line): scan each document once
+        queries = kwargs.get("queries") or []
+        if isinstance(queries, str):
+            queries = queries.splitlines()
+        queries = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+        if len(queries) > 1:
+            per_root_multi = await asyncio.gather(*(
+                asyncio.to_thread(
+                    self._content_multi_search_sync, queries, [root], ext_set, max_results
+                )
+                for root in roots
+            ))
+            reports = []
+            for q in queries:
+                results = list(itertools.chain.from_iterable(r[q] for r in per_root_multi))
+                reports.append(
+                    self._format_content_results(q, extensions, roots, results[:max_results])
+                )
+            return "\n\n".join(reports)
+
+        per_root = await asyncio.gather(*(
+            asyncio.to_thread(self._content_search_sync, query, [root], ext_set, max_results)
+            for root in roots
+        ))
+        results = list(itertools.chain.from_iterable(per_root))[:max_results]
+        return self._format_content_results(query, extensions, roots, results)
 
+    @staticmethod
+    def _format_content_results(
+        query: str, extensions: str, roots: list[str], results: list[dict[str, Any]]
+    ) -> str:
         if not results:
             return f"No files containing '{query}' found in: {', '.join(roots)}"
 
-        lines = [
-            f"**Content Search Results** — query: *{query}*\n",
-            f"Searched extensions: {extensions}\n",
-        ]
+        buf = io.StringIO()
+        w = buf.write
+        w(f"**Content Search Results** — query: *{query}*\n\n")
+        w(f"Searched extensions: {extensions}\n\n")
         for i, r in enumerate(results, 1):
-            lines.append(f"### {i}. {r['name']}")
-            lines.append(f"Path: `{r['path']}`\n")
+            w(f"### {i}. {r['name']}\n")
+            w(f"Path: `{r['path']}`\n\n")
             for excerpt in r["excerpts"]:
-                lines.append(f"> ...{excerpt}...\n")
-            lines.append("")
+                w(f"> ...{excerpt}...\n\n")
+            w("\n")
 
-        lines.append(f"**Total: {len(results)} file(s) containing '{query}'**")
+        w(f"**Total: {len(results)} file(s) containing '{query}'**\n")
 
         # Also append full extracted text for downstream agents
-        lines.append("\n\n---\n\n## Full Extracted Text\n")
+        w("\n\n---\n\n## Full Extracted Text\n")
         for r in results:
-            lines.append(f"### {r['name']}\n")
-            lines.append(r.get("full_text", "")[:8000])
-            lines.append("\n---\n")
+            w(f"\n### {r['name']}\n\n")
+            w(r.get("full_text", ""))
+            w("\n\n---\n")
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
     @staticmethod
     def _content_search_sync(
@@ -168,49 +204,100 @@ class FileSearchTool(BaseTool):
         max_results: int,
     ) -> list[dict[str, Any]]:
         """Walk directories, extract text from documents, search for query."""
-        q_lower = query.lower()
+        # Case-insensitive match without lowercasing each document
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
         results: list[dict[str, Any]] = []
 
-        for root in roots:
-            root_path = Path(root)
-            if not root_path.exists():
-                continue
-            try:
-                for p in root_path.rglob("*"):
-                    if len(results) >= max_results:
-                        break
-                    if not p.is_file():
-                        continue
-                    if p.suffix.lower() not in ext_set:
-                        continue
-                    try:
-                        text = _extract_text(p)
-                        if not text:
-                            continue
-                        if q_lower not in text.lower():
+        # Extraction is CPU-bound: fan candidate files out to the shared
+        # process pool in batches, keeping walk order and stopping early.
+        pool = get_process_pool()
+        with closing(_iter_candidates(roots, ext_set)) as candidates:
+            while len(results) < max_results:
+                batch = list(itertools.islice(candidates, _EXTRACT_BATCH))
+                if not batch:
+                    break
+                keys = {p: _no_match_key(p) for p in batch}
+                batch = [p for p in batch if not _known_no_match(keys[p], [query])]
+                if pool is not None:
+                    matches = pool.map(_match_file, batch, itertools.repeat(pattern))
+                else:
+                    matches = (_match_file(p, pattern) for p in batch)
+                with closing(matches) as outcomes:
+                    for path, found in zip(batch, outcomes):
+                        if found is None:
+                            _record_no_match(keys[path], [query])
                             continue
+                        text, offset = found
                         # Found a match — extract relevant excerpts
-                        excerpts = _extract_excerpts(text, query, context_chars=200)
+                        first = pattern.search(text, offset)
+                        excerpts = _extract_excerpts(text, pattern, context_chars=200, first=first)
                         results.append({
-                            "name": p.name,
-                            "path": str(p),
+                            "name": Path(path).name,
+                            "path": path,
                             "excerpts": excerpts[:5],  # max 5 excerpts per file
-                            "full_text": text,
+                            # Only this window is ever emitted; don't hold whole documents
+                            "full_text": text[:_FULL_TEXT_CHARS],
                         })
-                    except Exception:
-                        continue
-            except PermissionError:
-                continue
-            if len(results) >= max_results:
-                break
+                        del text
+                        if len(results) >= max_results:
+                            break  # closing() cancels the rest of the batch
+
+        return results
+
+    @staticmethod
+    def _content_multi_search_sync(
+        queries: list[str],
+        roots: list[str],
+        ext_set: set[str],
+        max_results: int,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Like :meth:`_content_search_sync` for several queries, scanning each
+        document once for all of them."""
+        matcher = _MultiMatcher(queries)
+        results: dict[str, list[dict[str, Any]]] = {q: [] for q in queries}
+        open_queries = set(range(len(queries)))
+
+        pool = get_process_pool()
+        with closing(_iter_candidates(roots, ext_set)) as candidates:
+            while open_queries:
+                batch = list(itertools.islice(candidates, _EXTRACT_BATCH))
+                if not batch:
+                    break
+                keys = {p: _no_match_key(p) for p in batch}
+                wanted = [queries[i] for i in open_queries]
+                batch = [p for p in batch if not _known_no_match(keys[p], wanted)]
+                if pool is not None:
+                    matches = pool.map(_match_file_multi, batch, itertools.repeat(matcher))
+                else:
+                    matches = (_match_file_multi(p, matcher) for p in batch)
+                with closing(matches) as outcomes:
+                    for path, found in zip(batch, outcomes):
+                        hits = found[1] if found is not None else set()
+                        _record_no_match(keys[path], [q for i, q in enumerate(queries) if i not in hits])
+                        if found is None:
+                            continue
+                        text, hits = found
+                        for i in hits & open_queries:
+                            excerpts = _extract_excerpts(text, matcher.patterns[i], context_chars=200)
+                            query_results = results[queries[i]]
+                            query_results.append({
+                                "name": Path(path).name,
+                                "path": path,
+                                "excerpts": excerpts[:5],  # max 5 excerpts per file
+                                "full_text": text[:_FULL_TEXT_CHARS],
+                            })
+                            if len(query_results) >= max_results:
+                                open_queries.discard(i)
+                        del text
+                        if not open_queries:
+                            break
 
         return results
 
     # ── dropbox ────────────────────────────────────────────────
 
     async def _search_dropbox(self, query: str, **kwargs: Any) -> str:
-        """Search Dropbox using files_search_v2."""
-        import dropbox
+        """Search Dropbox via the files/search_v2 REST endpoint."""
         from config import settings
 
         if not settings.dropbox_refresh_token:
@@ -221,32 +308,31 @@ class FileSearchTool(BaseTool):
 
         max_results = int(kwargs.get("max_results", 20))
 
-        # Run blocking SDK call in thread
-        def _do_search() -> list[dict[str, Any]]:
-            dbx = dropbox.Dropbox(
-                app_key=settings.dropbox_app_key,
-                app_secret=settings.dropbox_app_secret,
-                oauth2_refresh_token=settings.dropbox_refresh_token,
-            )
-            result = dbx.files_search_v2(query)
-            items: list[dict[str, Any]] = []
-            for match in result.matches[:max_results]:
-                metadata = match.metadata.get_metadata()
-                items.append({
-                    "name": metadata.name,
-                    "path": getattr(metadata, "path_display", ""),
-                    "size": getattr(metadata, "size", 0),
-                    "modified": str(getattr(metadata, "server_modified", "")),
-                })
-            return items
-
-        results = await asyncio.to_thread(_do_search)
+        token = await _get_dropbox_token(settings)
+        resp = await get_http_client().post(
+            "https://api.dropboxapi.com/2/files/search_v2",
+            json={"query": query, "options": {"max_results": max_results}},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        resp.raise_for_status()
+        data = resp.json()
+
+        results: list[dict[str, Any]] = []
+        for match in data.get("matches", [])[:max_results]:
+            metadata = match.get("metadata", {}).get("metadata", {})
+            results.append({
+                "name": metadata.get("name", ""),
+                "path": metadata.get("path_display", ""),
+                "size": metadata.get("size", 0),
+                "modified": metadata.get("server_modified", ""),
+            })
+
         return self._format_results("Dropbox", query, results)
 
     # ── gdrive ─────────────────────────────────────────────────
 
     async def _search_gdrive(self, query: str, **kwargs: Any) -> str:
-        """Search Google Drive via API."""
+        """Search Google Drive via the Drive v3 REST API."""
         from config import settings
 
         if not settings.google_drive_credentials_json:
@@ -257,43 +343,31 @@ class FileSearchTool(BaseTool):
 
         max_results = int(kwargs.get("max_results", 20))
 
-        def _do_search() -> list[dict[str, Any]]:
-            from google.oauth2 import service_account
-            from googleapiclient.discovery import build
+        token = await _get_gdrive_token(settings)
 
-            creds = service_account.Credentials.from_service_account_file(
-                settings.google_drive_credentials_json,
-                scopes=["https://www.googleapis.com/auth/drive.readonly"],
-            )
-            if settings.google_drive_delegated_user:
-                creds = creds.with_subject(settings.google_drive_delegated_user)
-
-            service = build("drive", "v3", credentials=creds)
-
-            # Escape single quotes in query
-            safe_q = query.replace("'", "\\'")
-            response = (
-                service.files()
-                .list(
-                    q=f"name contains '{safe_q}' and trashed=false",
-                    pageSize=max_results,
-                    fields="files(id, name, mimeType, size, modifiedTime, webViewLink)",
-                )
-                .execute()
-            )
+        # Escape single quotes in query
+        safe_q = query.replace("'", "\\'")
+        resp = await get_http_client().get(
+            "https://www.googleapis.com/drive/v3/files",
+            params={
+                "q": f"name contains '{safe_q}' and trashed=false",
+                "pageSize": max_results,
+                "fields": "files(id, name, mimeType, size, modifiedTime, webViewLink)",
+            },
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        resp.raise_for_status()
+
+        results: list[dict[str, Any]] = []
+        for f in resp.json().get("files", []):
+            results.append({
+                "name": f["name"],
+                "path": f.get("webViewLink", f["id"]),
+                "size": int(f.get("size", 0)),
+                "modified": f.get("modifiedTime", ""),
+                "mime_type": f.get("mimeType", ""),
+            })
 
-            items: list[dict[str, Any]] = []
-            for f in response.get("files", []):
-                items.append({
-                    "name": f["name"],
-                    "path": f.get("webViewLink", f["id"]),
-                    "size": int(f.get("size", 0)),
-                    "modified": f.get("modifiedTime", ""),
-                    "mime_type": f.get("mimeType", ""),
-                })
-            return items
-
-        results = await asyncio.to_thread(_do_search)
         return self._format_results("Google Drive", query, results)
 
     # ── onedrive ───────────────────────────────────────────────
@@ -314,16 +388,16 @@ class FileSearchTool(BaseTool):
         headers = {"Authorization": f"Bearer {token}"}
         user_id = settings.microsoft_user_id or "me"
 
-        import httpx
-
-        async with httpx.AsyncClient(timeout=15) as client:
-            url = (
-                f"https://graph.microsoft.com/v1.0/users/{user_id}"
-                f"/drive/root/search(q='{query}')"
-            )
-            resp = await client.get(url, headers=headers, params={"$top": max_results})
-            resp.raise_for_status()
-            data = resp.json()
+        url = (
+            f"https://graph.microsoft.com/v1.0/users/{user_id}"
+            f"/drive/root/search(q='{query}')"
+        )
+        resp = await get_http_client().get(url, headers=headers, params={"$top": max_results})
+        if resp.status_code == 401:
+            # Token revoked or rotated before expiry: fetch a fresh one next time
+            _MS_TOKENS.pop((settings.microsoft_tenant_id, settings.microsoft_client_id), None)
+        resp.raise_for_status()
+        data = resp.json()
 
         results: list[dict[str, Any]] = []
         for item in data.get("value", []):
@@ -359,114 +433,562 @@ class FileSearchTool(BaseTool):
         return "\n".join(lines)
 
 
-# ── shared Microsoft token helper ──────────────────────────────
+# ── cloud access tokens ───────────────────────────────────────
+
+# Short-lived access tokens, refreshed EXPIRATION_BUFFER seconds early:
+# Dropbox app key -> (token, monotonic expiry)
+_DROPBOX_TOKENS: dict[str, tuple[str, float]] = {}
+# (tenant, client_id) -> Microsoft Graph (token, monotonic expiry)
+_MS_TOKENS: dict[tuple[str, str], tuple[str, float]] = {}
+# (credentials file, delegated user) -> google service account credentials
+_GDRIVE_CREDS: dict[tuple[str, str], Any] = {}
+EXPIRATION_BUFFER = 30
+
+
+async def _get_dropbox_token(settings: Any) -> str:
+    """Exchange the Dropbox refresh token for a (cached) access token."""
+    cached = _DROPBOX_TOKENS.get(settings.dropbox_app_key)
+    if cached and time.monotonic() < cached[1] - EXPIRATION_BUFFER:
+        return cached[0]
+
+    resp = await get_http_client().post(
+        "https://api.dropboxapi.com/oauth2/token",
+        data={
+            "grant_type": "refresh_token",
+            "refresh_token": settings.dropbox_refresh_token,
+            "client_id": settings.dropbox_app_key,
+            "client_secret": settings.dropbox_app_secret,
+        },
+    )
+    resp.raise_for_status()
+    token_data = resp.json()
+    access_token = token_data["access_token"]
+    expires_in = float(token_data.get("expires_in", 14400))
+    _DROPBOX_TOKENS[settings.dropbox_app_key] = (access_token, time.monotonic() + expires_in)
+    return access_token
+
+
+async def _get_gdrive_token(settings: Any) -> str:
+    """Return a Drive access token from cached service account credentials."""
+    key = (settings.google_drive_credentials_json, settings.google_drive_delegated_user)
+    creds = _GDRIVE_CREDS.get(key)
+    if creds is None:
+        from google.oauth2 import service_account
+
+        creds = service_account.Credentials.from_service_account_file(
+            settings.google_drive_credentials_json,
+            scopes=["https://www.googleapis.com/auth/drive.readonly"],
+        )
+        if settings.google_drive_delegated_user:
+            creds = creds.with_subject(settings.google_drive_delegated_user)
+        _GDRIVE_CREDS[key] = creds
+
+    # creds.valid already treats tokens close to expiry as invalid
+    if not creds.valid:
+        from google.auth.transport.requests import Request
+
+        await asyncio.to_thread(creds.refresh, Request())
+    return creds.token
+
 
 # ── document text extraction helpers ───────────────────────────
 
+# Files handed to the process pool per round in content search
+_EXTRACT_BATCH = 32
 
-def _extract_text(path: Path) -> str:
-    """Extract text content from a file. Supports PDF, DOCX, PPTX, and text files."""
-    suffix = path.suffix.lower()
 
-    if suffix == ".pdf":
-        return _extract_pdf(path)
-    elif suffix == ".docx":
-        return _extract_docx(path)
-    elif suffix == ".pptx":
-        return _extract_pptx(path)
-    elif suffix in (".txt", ".md", ".csv", ".py", ".js", ".ts", ".html", ".xml", ".yaml", ".yml"):
+def _iter_files(root: str) -> Iterator[os.DirEntry[str]]:
+    """Walk *root* with ``os.scandir``, yielding files.
+
+    ``DirEntry.is_dir``/``is_file`` use the file type from the directory
+    listing, so no extra stat per entry. Symlinked files are yielded (as
+    ``rglob`` did); symlinked directories are not descended into, which
+    rules out loops. Close the generator to stop the walk and release the
+    open directory.
+    """
+    stack = [root]
+    try:
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file():
+                                yield entry
+                        except OSError:
+                            continue
+            except OSError:  # missing root, permission denied, ...
+                continue
+    finally:
+        # Closed early (GeneratorExit): drop the pending directories
+        stack.clear()
+
+
+def _iter_candidates(roots: list[str], ext_set: set[str]) -> Iterator[str]:
+    """Walk *roots* recursively, yielding paths of files whose suffix is in *ext_set*."""
+    suffixes = tuple(sorted(ext_set))
+    for root in roots:
+        with closing(_iter_files(root)) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(suffixes):
+                    yield entry.path
+
+
+# Extraction stops early once this many matches are found...
+_MAX_EXCERPTS = 5
+# ...and the text covers their trailing context and the emitted full text
+_EXCERPT_CONTEXT = 200
+_FULL_TEXT_CHARS = 8000
+
+
+def _match_file(path: str, pattern: re.Pattern[str]) -> tuple[str, int] | None:
+    """Process-pool worker: extract *path*'s text and search it.
+
+    Returns ``(text, offset of the first match)``, or None when the file
+    has no text or doesn't match (so non-matching text isn't sent back).
+    Text is streamed page by page and extraction stops as soon as enough
+    matches (with context) have been seen, so *text* may be a prefix of
+    the document.
+    """
+    p = Path(path)
+    try:
+        if not _bytes_may_contain(p, [pattern]):
+            return None  # query absent from the raw bytes: skip extraction
+        cache = _text_cache()
+        key = _cache_key(p) if cache is not None else None
+        text = cache.get(key) if cache is not None else None
+        if text is not None:
+            has_match = _hs_scanner(pattern)
+            if has_match is not None and not has_match(text):
+                return None
+            m = pattern.search(text)
+            return None if m is None else (text, m.start())
+
+        # A match straddling two chunks starts at most this far back
+        overlap = len(pattern.pattern)
+        has_match = _hs_scanner(pattern)
+        text, first, hits, scan = "", -1, 0, 0
+        with closing(_iter_text(p)) as chunks:
+            for chunk in chunks:
+                text += chunk
+                if first < 0 and has_match is not None and not has_match(text[scan:]):
+                    # Nothing yet: skip the regex scan of this chunk
+                    scan = max(scan, len(text) - overlap)
+                elif hits < _MAX_EXCERPTS:
+                    for m in pattern.finditer(text, scan):
+                        if first < 0:
+                            first = m.start()
+                        hits += 1
+                        scan = m.end()
+                        if hits >= _MAX_EXCERPTS:
+                            break
+                    else:
+                        scan = max(scan, len(text) - overlap)
+                elif len(text) >= max(scan + _EXCERPT_CONTEXT, _FULL_TEXT_CHARS):
+                    return text, first  # partial text: not cached
+        if cache is not None:
+            cache.set(key, text)
+    except Exception:
+        return None
+    return None if first < 0 else (text, first)
+
+
+# Per-process Hyperscan databases by regex source; False = unavailable/disabled
+_HS_DBS: dict[str, Any] = {}
+
+
+def _hs_scanner(pattern: re.Pattern[str]) -> Callable[[str], bool] | None:
+    """Return a Hyperscan-backed "does *pattern* occur in text" test.
+
+    None when disabled (``file_search_use_hyperscan``) or python-hyperscan
+    isn't installed; callers then search with *pattern* directly.
+    """
+    db = _HS_DBS.get(pattern.pattern)
+    if db is None:
+        db = False
         try:
-            return path.read_text(errors="replace")
+            from config import settings
+
+            if settings.file_search_use_hyperscan:
+                import hyperscan
+
+                db = hyperscan.Database()
+                db.compile(
+                    expressions=[pattern.pattern.encode()],
+                    flags=[
+                        hyperscan.HS_FLAG_CASELESS
+                        | hyperscan.HS_FLAG_SINGLEMATCH
+                        | hyperscan.HS_FLAG_UTF8
+                        | hyperscan.HS_FLAG_UCP
+                    ],
+                )
         except Exception:
-            return ""
-    return ""
+            db = False
+        if len(_HS_DBS) >= 64:
+            _HS_DBS.clear()
+        _HS_DBS[pattern.pattern] = db
+    if not db:
+        return None
+
+    def has_match(text: str) -> bool:
+        found: list[bool] = []
+        # HS_FLAG_UTF8 requires valid UTF-8: replace lone surrogates
+        db.scan(
+            text.encode("utf-8", "replace"),
+            match_event_handler=lambda *_: found.append(True),
+        )
+        return bool(found)
 
+    return has_match
 
-def _extract_pdf(path: Path) -> str:
-    """Extract text from PDF."""
+
+class _MultiMatcher:
+    """Finds which of several queries occur in a text, case-insensitively.
+
+    Uses an Aho-Corasick automaton (pyahocorasick) when installed, so a
+    text is scanned once whatever the number of queries; otherwise runs
+    one regex per query. Picklable, for the process pool.
+    """
+
+    def __init__(self, queries: list[str]) -> None:
+        self.patterns = [re.compile(re.escape(q), re.IGNORECASE) for q in queries]
+        try:
+            import ahocorasick
+        except ImportError:
+            self.automaton = None
+            return
+        self.automaton = ahocorasick.Automaton()
+        for i, q in enumerate(queries):
+            self.automaton.add_word(q.lower(), i)
+        self.automaton.make_automaton()
+
+    def matched(self, text: str) -> set[int]:
+        """Return the indices of the queries found in *text*."""
+        if self.automaton is None:
+            return {i for i, p in enumerate(self.patterns) if p.search(text)}
+        found: set[int] = set()
+        for _, i in self.automaton.iter(text.lower()):
+            found.add(i)
+            if len(found) == len(self.patterns):
+                break
+        return found
+
+
+def _match_file_multi(path: str, matcher: _MultiMatcher) -> tuple[str, set[int]] | None:
+    """Process-pool worker: extract *path*'s text and find which queries it contains."""
     try:
-        from PyPDF2 import PdfReader
-        reader = PdfReader(str(path))
-        pages = []
-        for page in reader.pages:
-            text = page.extract_text() or ""
-            if text.strip():
-                pages.append(text)
-        return "\n\n".join(pages)
+        if not _bytes_may_contain(Path(path), matcher.patterns):
+            return None
+        text = _cached_extract_text(Path(path))
     except Exception:
-        return ""
+        return None
+    hits = matcher.matched(text) if text else set()
+    return (text, hits) if hits else None
+
+
+# Per-process handle on the on-disk text cache: False = unavailable/disabled
+_TEXT_CACHE: Any = None
 
 
-def _extract_docx(path: Path) -> str:
-    """Extract text from DOCX."""
+def _text_cache() -> Any:
+    """Open the extracted-text cache (diskcache, safe across pool workers).
+
+    Returns None when disabled or unavailable. Test with ``is None``: an
+    empty diskcache.Cache is falsy.
+    """
+    global _TEXT_CACHE
+    if _TEXT_CACHE is None:
+        _TEXT_CACHE = False
+        try:
+            from config import settings
+
+            if settings.file_search_cache_enabled:
+                import diskcache
+
+                _TEXT_CACHE = diskcache.Cache(
+                    settings.file_search_cache_dir,
+                    size_limit=settings.file_search_cache_max_mb * 1024 * 1024,
+                    eviction_policy="least-recently-used",
+                )
+        except Exception:
+            pass
+    return _TEXT_CACHE if _TEXT_CACHE is not False else None
+
+
+def _cache_key(path: Path) -> str:
+    """Text-cache key: changes whenever the file is modified."""
+    st = path.stat()
+    return f"{path}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def _cached_extract_text(path: Path) -> str:
+    """:func:`_extract_text`, cached on disk by (path, mtime, size)."""
+    cache = _text_cache()
+    if cache is None:
+        return _extract_text(path)
+    key = _cache_key(path)
+    text = cache.get(key)
+    if text is None:
+        text = _extract_text(path)
+        cache.set(key, text)
+    return text
+
+
+# Queries known not to occur in a PDF/DOCX/PPTX, by (path, mtime_ns, size):
+# repeat searches skip re-extracting those documents. Lives in the searching
+# process (not the pool workers); bounded LRU over files, newest queries kept.
+_NO_MATCH: OrderedDict[tuple[str, int, int], dict[str, None]] = OrderedDict()
+_NO_MATCH_LOCK = threading.Lock()
+_NO_MATCH_FILES = 4096
+_NO_MATCH_QUERIES = 16
+
+
+def _no_match_key(path: str) -> tuple[str, int, int] | None:
+    """Negative-cache key for *path*; None for plain text (prefiltered by bytes)."""
+    if Path(path).suffix.lower() in _TEXT_SUFFIXES:
+        return None
     try:
-        from docx import Document
-        doc = Document(str(path))
-        return "\n".join(para.text for para in doc.paragraphs if para.text.strip())
-    except Exception:
-        return ""
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size
+
+
+def _known_no_match(key: tuple[str, int, int] | None, queries: list[str]) -> bool:
+    """True when none of *queries* occurs in the document behind *key*."""
+    if key is None:
+        return False
+    with _NO_MATCH_LOCK:
+        absent = _NO_MATCH.get(key)
+        if absent is None:
+            return False
+        _NO_MATCH.move_to_end(key)
+        return all(q in absent for q in queries)
+
+
+def _record_no_match(key: tuple[str, int, int] | None, queries: list[str]) -> None:
+    """Remember that *queries* don't occur in the document behind *key*."""
+    if key is None or not queries:
+        return
+    with _NO_MATCH_LOCK:
+        absent = _NO_MATCH.setdefault(key, {})
+        _NO_MATCH.move_to_end(key)
+        for q in queries:
+            absent.pop(q, None)
+            absent[q] = None
+        while len(absent) > _NO_MATCH_QUERIES:
+            del absent[next(iter(absent))]
+        while len(_NO_MATCH) > _NO_MATCH_FILES:
+            _NO_MATCH.popitem(last=False)
+
+
+# Raw-bytes prefilter for plain-text files: an ASCII query whose lowercased
+# bytes never occur in the file can't match its decoded text either, so the
+# decode + regex scan is skipped. These characters also match ASCII letters
+# under re.IGNORECASE, so files containing them (UTF-8) are always searched.
+_CASE_TRAPS = tuple(c.encode() for c in "\u0130\u0131\u017f\u212a")
+_BYTES_PREFILTER = codecs.lookup(locale.getpreferredencoding(False)).name == "utf-8"
+
+
+@functools.lru_cache(maxsize=64)
+def _query_bytes(source: str) -> bytes | None:
+    """Lowercased bytes of the query behind an escaped regex *source*.
+
+    None (no prefilter) for non-ASCII queries and ones spanning line ends,
+    which newline translation can make match differently than the raw bytes.
+    """
+    query = re.sub(r"\\(.)", r"\1", source, flags=re.DOTALL)
+    if not query.isascii() or "\n" in query or "\r" in query:
+        return None
+    return query.lower().encode()
+
+
+def _bytes_may_contain(
+    path: Path, patterns: list[re.Pattern[str]], block_size: int = 1 << 20,
+) -> bool:
+    """False only when no pattern's query occurs in *path*'s raw bytes.
+
+    Applies to plain-text suffixes only; other formats have to be extracted.
+    """
+    if not _BYTES_PREFILTER or path.suffix.lower() not in _TEXT_SUFFIXES:
+        return True
+    needles = [_query_bytes(p.pattern) for p in patterns]
+    if not needles or None in needles:
+        return True
+    overlap = max(len(n) for n in needles) - 1
+    tail = b""
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            # Keep the tail so a query straddling two blocks is still seen
+            data = tail + block
+            if not data.isascii() and any(t in data for t in _CASE_TRAPS):
+                return True
+            data = data.lower()
+            if any(n in data for n in needles):
+                return True
+            tail = data[-overlap:] if overlap else b""
+    return False
+
+
+_TEXT_SUFFIXES = (".txt", ".md", ".csv", ".py", ".js", ".ts", ".html", ".xml", ".yaml", ".yml")
 
 
-def _extract_pptx(path: Path) -> str:
-    """Extract text from PPTX (PowerPoint)."""
+def _extract_text(path: Path) -> str:
+    """Extract text content from a file. Supports PDF, DOCX, PPTX, and text files."""
     try:
-        from pptx import Presentation
-        prs = Presentation(str(path))
-        texts = []
-        for slide_num, slide in enumerate(prs.slides, 1):
-            slide_texts = []
-            for shape in slide.shapes:
-                if shape.has_text_frame:
-                    for paragraph in shape.text_frame.paragraphs:
-                        text = paragraph.text.strip()
-                        if text:
-                            slide_texts.append(text)
-            if slide_texts:
-                texts.append(f"[Slide {slide_num}]\n" + "\n".join(slide_texts))
-        return "\n\n".join(texts)
+        with closing(_iter_text(path)) as chunks:
+            return "".join(chunks)
     except Exception:
         return ""
 
 
-def _extract_excerpts(text: str, query: str, context_chars: int = 200) -> list[str]:
-    """Extract text excerpts around each occurrence of query."""
-    excerpts = []
-    text_lower = text.lower()
-    q_lower = query.lower()
-    start = 0
-
-    while True:
-        idx = text_lower.find(q_lower, start)
-        if idx == -1:
-            break
-        excerpt_start = max(0, idx - context_chars)
-        excerpt_end = min(len(text), idx + len(query) + context_chars)
-        excerpt = text[excerpt_start:excerpt_end].replace("\n", " ").strip()
-        excerpts.append(excerpt)
-        start = idx + len(query)
-        if len(excerpts) >= 10:
-            break
+def _iter_text(path: Path) -> Iterator[str]:
+    """Yield a file's text in chunks (pages, paragraphs, slides, blocks)."""
+    suffix = path.suffix.lower()
+
+    if suffix == ".pdf":
+        return _iter_pdf_text(path)
+    elif suffix == ".docx":
+        return _iter_docx_paragraphs(path)
+    elif suffix == ".pptx":
+        return _iter_pptx_slides(path)
+    elif suffix in _TEXT_SUFFIXES:
+        return _iter_plain_text(path)
+    return iter(())
+
 
+def _iter_plain_text(path: Path, block_size: int = 1 << 16) -> Iterator[str]:
+    """Yield a text file in blocks."""
+    with open(path, errors="replace") as f:
+        while block := f.read(block_size):
+            yield block
+
+
+def _iter_pdf_text(path: Path) -> Iterator[str]:
+    """Yield PDF page texts (pypdfium2 when installed, else PyPDF2)."""
+    from tools.file_processor import _iter_pdf_pages
+
+    sep = ""
+    with closing(_iter_pdf_pages(path)) as page_texts:
+        for text in page_texts:
+            if text.strip():
+                yield sep + text
+                sep = "\n\n"
+
+
+def _iter_docx_paragraphs(path: Path) -> Iterator[str]:
+    """Yield DOCX paragraph texts."""
+    from docx import Document
+
+    doc = Document(str(path))
+    sep = ""
+    for para in doc.paragraphs:
+        if para.text.strip():
+            yield sep + para.text
+            sep = "\n"
+
+
+_PPTX_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_PPTX_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_PPTX_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PPTX_PKG = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _iter_pptx_slides(path: Path) -> Iterator[str]:
+    """Yield PPTX (PowerPoint) slide texts.
+
+    Reads the slide XML parts straight from the zip, one slide at a time,
+    instead of loading the whole deck with python-pptx, so a caller that
+    stops early never parses the remaining slides.
+    """
+    import posixpath
+    import zipfile
+
+    from lxml import etree
+
+    with zipfile.ZipFile(path) as zf:
+        # Deck order comes from presentation.xml's slide id list
+        with zf.open("ppt/_rels/presentation.xml.rels") as f:
+            targets = {
+                rel.get("Id"): rel.get("Target")
+                for rel in etree.parse(f).getroot().iter(f"{_PPTX_PKG}Relationship")
+            }
+        parts = []
+        with zf.open("ppt/presentation.xml") as f:
+            for sld in etree.parse(f).getroot().iter(f"{_PPTX_P}sldId"):
+                target = targets.get(sld.get(f"{_PPTX_R}id"))
+                if target:
+                    # Targets are relative to ppt/ unless absolute in the package
+                    parts.append(
+                        target[1:] if target.startswith("/")
+                        else posixpath.normpath(posixpath.join("ppt", target))
+                    )
+
+        sep = ""
+        for slide_num, part in enumerate(parts, 1):
+            slide_texts = []
+            with zf.open(part) as f:
+                for _, para in etree.iterparse(f, tag=f"{_PPTX_A}p"):
+                    text = "".join(
+                        (el.text or "") if el.tag != f"{_PPTX_A}br" else "\n"
+                        for el in para.iter(f"{_PPTX_A}t", f"{_PPTX_A}br")
+                    ).strip()
+                    para.clear()
+                    if text:
+                        slide_texts.append(text)
+            if slide_texts:
+                yield sep + f"[Slide {slide_num}]\n" + "\n".join(slide_texts)
+                sep = "\n\n"
+
+
+def _extract_excerpts(
+    text: str,
+    pattern: re.Pattern[str],
+    context_chars: int = 200,
+    first: re.Match[str] | None = None,
+) -> list[str]:
+    """Extract text excerpts around each match of *pattern* in *text*.
+
+    If the caller already found the *first* match, scanning resumes after
+    it instead of starting again from offset 0.
+    """
+    if first is None:
+        matches = pattern.finditer(text)
+    else:
+        matches = itertools.chain((first,), pattern.finditer(text, first.end()))
+    excerpts = []
+    for m in itertools.islice(matches, 10):
+        excerpt_start = max(0, m.start() - context_chars)
+        excerpt_end = min(len(text), m.end() + context_chars)
+        excerpts.append(text[excerpt_start:excerpt_end].replace("\n", " ").strip())
     return excerpts
 
 
 async def _get_ms_token(settings: Any) -> str:
-    """Obtain Microsoft Graph access token via client credentials flow."""
-    import httpx
+    """Obtain Microsoft Graph access token via client credentials flow (cached)."""
+    key = (settings.microsoft_tenant_id, settings.microsoft_client_id)
+    cached = _MS_TOKENS.get(key)
+    if cached and time.monotonic() < cached[1] - EXPIRATION_BUFFER:
+        return cached[0]
 
     url = (
         f"https://login.microsoftonline.com/"
         f"{settings.microsoft_tenant_id}/oauth2/v2.0/token"
     )
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.post(
-            url,
-            data={
-                "grant_type": "client_credentials",
-                "client_id": settings.microsoft_client_id,
-                "client_secret": settings.microsoft_client_secret,
-                "scope": "https://graph.microsoft.com/.default",
-            },
-        )
-        resp.raise_for_status()
-        return resp.json()["access_token"]
+    resp = await get_http_client().post(
+        url,
+        data={
+            "grant_type": "client_credentials",
+            "client_id": settings.microsoft_client_id,
+            "client_secret": settings.microsoft_client_secret,
+            "scope": "https://graph.microsoft.com/.default",
+        },
+    )
+    resp.raise_for_status()
+    token_data = resp.json()
+    access_token = token_data["access_token"]
+    expires_in = float(token_data.get("expires_in", 3600))
+    _MS_TOKENS[key] = (access_token, time.monotonic() + expires_in)
+    return access_token
@@ -5,22 +5,35 @@ Supports: shapefiles, geopackages, GeoTIFF, DEM rasters, vector analysis
 and map output as PNG images.
 
 Required: geopandas, rasterio, matplotlib, shapely, fiona
-Optional: numpy, scipy (for DEM analysis)
+Optional: numpy, scipy (for DEM analysis), numba (faster DEM analysis)
 """
 
 from __future__ import annotations
 
 import base64
+import functools
 import io
 import json
 import os
 import tempfile
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
 from tools import BaseTool
 
 OUTPUT_DIR = Path("data/gis_output")
+UPLOADS_DIR = Path("data/uploads")
+
+# Upload index: (directory signature, by basename, first file per suffix)
+_UPLOAD_INDEX: tuple[tuple, dict[str, Path], dict[str, Path]] = ((), {}, {})
+
+# info results, keyed by (path, mtime_ns, size, layer); least recently
+# used first. Reports longer than _INFO_CACHE_MAX_CHARS (big GeoJSON
+# artifacts) are not kept.
+_INFO_CACHE: OrderedDict[tuple, str] = OrderedDict()
+_INFO_CACHE_SIZE = 32
+_INFO_CACHE_MAX_CHARS = 4_000_000
 
 
 class GISTool(BaseTool):
@@ -72,26 +85,48 @@ class GISTool(BaseTool):
         - Relative paths in CWD
         - Filenames that might be in data/uploads/ directories
         """
-        line = text.strip().splitlines()[0].strip()
+        line = text.lstrip().partition("\n")[0].strip()
         p = Path(line)
 
-        # If it's an absolute path that exists, use it
-        if p.is_absolute() and p.exists():
-            return p
-
-        # If relative path exists in CWD
-        if p.exists():
+        # Absolute path, or relative path in CWD, that exists
+        if os.path.exists(line):
             return p
 
         # Search in uploads directory (files saved by the upload system)
-        uploads_dir = Path("data/uploads")
-        if uploads_dir.exists():
-            for match in uploads_dir.rglob(f"*{p.suffix}"):
-                # Match by original filename stored in the path
-                if match.exists():
-                    return match
+        by_name, by_suffix = _upload_index()
+        match = by_name.get(p.name) or by_suffix.get(p.suffix)
+        return match or p
+
+    @staticmethod
+    def _read(path: Path, layer: str | None = None):
+        """Read a vector file, through Arrow (pyogrio + pyarrow) when available."""
+        import geopandas as gpd
+
+        if path.suffix.lower() == ".parquet":
+            return gpd.read_parquet(path)
+        if _arrow_io()[0]:
+            return gpd.read_file(path, layer=layer, engine="pyogrio", use_arrow=True)
+        return gpd.read_file(path, layer=layer)
+
+    @staticmethod
+    def _write(gdf, out_path: Path) -> None:
+        """Write a GeoDataFrame: GeoParquet for ``.parquet``, else GeoPackage.
+
+        GeoPackage writes go through Arrow when pyogrio + pyarrow (GDAL >= 3.8)
+        are available.
+        """
+        if out_path.suffix == ".parquet":
+            gdf.to_parquet(out_path)
+        elif _arrow_io()[1]:
+            gdf.to_file(out_path, driver="GPKG", engine="pyogrio", use_arrow=True)
+        else:
+            gdf.to_file(out_path, driver="GPKG")
 
-        return p
+    @staticmethod
+    def _vector_ext(kwargs: dict[str, Any]) -> str:
+        """Output extension from the ``output_format`` kwarg (gpkg or parquet)."""
+        fmt = str(kwargs.get("output_format", "gpkg")).lower().lstrip(".")
+        return ".parquet" if fmt in ("parquet", "geoparquet") else ".gpkg"
 
     @staticmethod
     def _save_figure(fig, name: str = "map") -> tuple[str, str]:
@@ -99,25 +134,48 @@ class GISTool(BaseTool):
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
         import hashlib
-        h = hashlib.md5(name.encode()).hexdigest()[:8]
+        h = hashlib.blake2b(name.encode(), digest_size=4).hexdigest()
         out_path = OUTPUT_DIR / f"{name}_{h}.png"
 
+        # Fast deflate: level 3 is about twice as fast as the default 6
         buf = io.BytesIO()
         fig.savefig(buf, format="png", dpi=150, bbox_inches="tight",
-                    facecolor="#1a1a2e", edgecolor="none")
-        buf.seek(0)
-        out_path.write_bytes(buf.getvalue())
+                    facecolor="#1a1a2e", edgecolor="none",
+                    pil_kwargs={"optimize": False, "compress_level": 3})
+        raw = buf.getvalue()
+        out_path.write_bytes(raw)
 
-        b64 = base64.b64encode(buf.getvalue()).decode()
+        b64 = base64.b64encode(raw).decode()
         return str(out_path), b64
 
+    @staticmethod
+    def _geom_type_summary(gdf) -> tuple[dict[str, int], bool, bool]:
+        """Return (geometry type counts, has polygons, has lines).
+
+        Reads the geometry types once as a categorical instead of once per
+        question.
+        """
+        geom_type = gdf.geom_type.astype("category")
+        counts = geom_type.value_counts()
+        counts = counts[counts > 0]  # categoricals count unused categories too
+        types = set(counts.index)
+        return (
+            counts.to_dict(),
+            not types.isdisjoint(("Polygon", "MultiPolygon")),
+            not types.isdisjoint(("LineString", "MultiLineString")),
+        )
+
     @staticmethod
     def _gdf_to_geojson(gdf) -> str:
         """Convert a GeoDataFrame to GeoJSON string for frontend rendering."""
         # Reproject to WGS84 for Leaflet
         if gdf.crs and not gdf.crs.is_geographic:
             gdf = gdf.to_crs(epsg=4326)
-        return gdf.to_json()
+        try:
+            import orjson
+        except ImportError:
+            return gdf.to_json()
+        return _feature_collection(gdf, orjson)
 
     # ── operations ───────────────────────────────────────────────
 
@@ -125,23 +183,36 @@ class GISTool(BaseTool):
         """Get info about a geospatial file."""
         path = self._resolve_path(input_text)
 
-        if not path.exists():
+        try:
+            st = path.stat()
+        except OSError:
             return f"File not found: {path}"
 
         ext = path.suffix.lower()
         layer = kwargs.get("layer")
 
+        # Same file, unchanged since the last call: reuse the report
+        key = (str(path.resolve()), st.st_mtime_ns, st.st_size, layer)
+        cached = _INFO_CACHE.get(key)
+        if cached is not None:
+            _INFO_CACHE.move_to_end(key)
+            return cached
+
         if ext in (".tif", ".tiff", ".geotiff"):
-            return self._raster_info(path)
+            result = self._raster_info(path)
         else:
-            return self._vector_info(path, layer=layer)
+            result = self._vector_info(path, layer=layer)
+
+        if len(result) <= _INFO_CACHE_MAX_CHARS:
+            _INFO_CACHE[key] = result
+            if len(_INFO_CACHE) > _INFO_CACHE_SIZE:
+                _INFO_CACHE.popitem(last=False)
+        return result
 
     def _vector_info(self, path: Path, layer: str | None = None) -> str:
         """Get info about a vector file."""
-        import geopandas as gpd
-
-        gdf = gpd.read_file(path, layer=layer)
-        geom_types = gdf.geometry.geom_type.value_counts().to_dict()
+        gdf = self._read(path, layer=layer)
+        geom_types, _, _ = self._geom_type_summary(gdf)
         bounds = gdf.total_bounds  # [minx, miny, maxx, maxy]
 
         geojson_str = self._gdf_to_geojson(gdf)
@@ -179,49 +250,50 @@ class GISTool(BaseTool):
                 f"- NoData: {src.nodata}",
             ]
 
-            # Basic stats for first band
-            import numpy as np
-            data = src.read(1)
-            valid = data[data != src.nodata] if src.nodata is not None else data
-            if valid.size > 0:
+            # Basic stats for first band (streamed, not read whole)
+            stats = _band_stats(src)
+            if stats is not None:
                 lines.extend([
                     "",
                     "Band 1 statistics:",
-                    f"- Min: {np.nanmin(valid):.4f}",
-                    f"- Max: {np.nanmax(valid):.4f}",
-                    f"- Mean: {np.nanmean(valid):.4f}",
-                    f"- Std: {np.nanstd(valid):.4f}",
+                    f"- Min: {stats['min']:.4f}",
+                    f"- Max: {stats['max']:.4f}",
+                    f"- Mean: {stats['mean']:.4f}",
+                    f"- Std: {stats['std']:.4f}",
                 ])
 
         return "\n".join(lines)
 
     def _vector_analysis(self, input_text: str, **kwargs: Any) -> str:
         """Analyze vector geometries: area, length, centroid, etc."""
-        import geopandas as gpd
         import numpy as np
 
         path = self._resolve_path(input_text)
         layer = kwargs.get("layer")
-        gdf = gpd.read_file(path, layer=layer)
+        gdf = self._read(path, layer=layer)
 
         analysis_type = kwargs.get("analysis_type", "summary")
 
-        # Reproject to metric CRS for accurate measurements if geographic
-        gdf_m = gdf.to_crs(epsg=3857) if gdf.crs and gdf.crs.is_geographic else gdf
-
         lines = [f"**Vector Analysis**: {path.name}", ""]
 
+        geom_types, has_polygons, has_lines = self._geom_type_summary(gdf)
+        want_area = has_polygons and analysis_type in ("area", "summary", "all")
+        want_length = has_lines and analysis_type in ("length", "summary", "all")
+
+        # Reproject to metric CRS for accurate measurements if geographic;
+        # skipped when nothing is measured, so the only transform left is
+        # the WGS84 one for the GeoJSON artifact
+        gdf_m = gdf
+        if (want_area or want_length) and gdf.crs and gdf.crs.is_geographic:
+            gdf_m = gdf.to_crs(epsg=3857)
+
         if analysis_type in ("summary", "all"):
-            geom_types = gdf.geometry.geom_type.value_counts()
             lines.append("Geometry types:")
             for gt, count in geom_types.items():
                 lines.append(f"  - {gt}: {count}")
             lines.append("")
 
-        has_polygons = any(gdf.geometry.geom_type.isin(["Polygon", "MultiPolygon"]))
-        has_lines = any(gdf.geometry.geom_type.isin(["LineString", "MultiLineString"]))
-
-        if has_polygons and analysis_type in ("area", "summary", "all"):
+        if want_area:
             areas = gdf_m.geometry.area
             lines.extend([
                 "Area statistics (m^2):",
@@ -232,7 +304,7 @@ class GISTool(BaseTool):
                 "",
             ])
 
-        if has_lines and analysis_type in ("length", "summary", "all"):
+        if want_length:
             lengths = gdf_m.geometry.length
             lines.extend([
                 "Length statistics (m):",
@@ -265,45 +337,48 @@ class GISTool(BaseTool):
     def _raster_analysis(self, input_text: str, **kwargs: Any) -> str:
         """Analyze raster data: statistics, histogram."""
         import rasterio
-        import numpy as np
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
+        plt = _pyplot()
 
         path = self._resolve_path(input_text)
         band = int(kwargs.get("band", 1))
 
         with rasterio.open(path) as src:
-            data = src.read(band).astype(float)
-            if src.nodata is not None:
-                data[data == src.nodata] = np.nan
-
-            valid = data[~np.isnan(data)]
+            # Statistics stream over the full-resolution band in strips
+            stats = _band_stats(src, band, percentiles=(5, 25, 50, 75, 95), hist_bins=50)
+            if stats is None:
+                raise ValueError(f"band {band} has no valid pixels")
 
+            # Large bands get histogram-interpolated percentiles
+            approx = "" if stats["percentiles_exact"] else "≈"
             lines = [
                 f"**Raster Analysis**: {path.name} (band {band})",
                 f"- Size: {src.width} x {src.height}",
-                f"- Valid pixels: {valid.size} / {data.size}",
-                f"- Min: {np.nanmin(valid):.4f}",
-                f"- Max: {np.nanmax(valid):.4f}",
-                f"- Mean: {np.nanmean(valid):.4f}",
-                f"- Median: {np.nanmedian(valid):.4f}",
-                f"- Std: {np.nanstd(valid):.4f}",
+                f"- Valid pixels: {stats['count']} / {src.width * src.height}",
+                f"- Min: {stats['min']:.4f}",
+                f"- Max: {stats['max']:.4f}",
+                f"- Mean: {stats['mean']:.4f}",
+                f"- Median: {approx}{stats['percentiles'][50]:.4f}",
+                f"- Std: {stats['std']:.4f}",
             ]
 
             # Percentiles
-            for p in [5, 25, 50, 75, 95]:
-                val = np.nanpercentile(valid, p)
-                lines.append(f"- P{p}: {val:.4f}")
+            for p, val in stats["percentiles"].items():
+                lines.append(f"- P{p}: {approx}{val:.4f}")
+            if approx:
+                lines.append("- (≈: approximated from a histogram; band too large for exact percentiles)")
 
             # Generate raster visualization
             fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+            # Statistics cover every pixel; the image only needs display size
+            data, _ = _display_read(src, band, fig.get_size_inches())
 
-            im = axes[0].imshow(data, cmap="terrain")
+            im = _imshow_u8(axes[0], data, "terrain")
             axes[0].set_title(f"{path.name} (band {band})", color="white", fontsize=10)
             plt.colorbar(im, ax=axes[0], shrink=0.8)
 
-            axes[1].hist(valid.flatten(), bins=50, color="#4f9dda", alpha=0.8, edgecolor="none")
+            counts, edges = stats["hist"]
+            axes[1].hist(edges[:-1], bins=edges, weights=counts,
+                         color="#4f9dda", alpha=0.8, edgecolor="none")
             axes[1].set_title("Value Distribution", color="white", fontsize=10)
             axes[1].set_xlabel("Value", color="white")
             axes[1].set_ylabel("Count", color="white")
@@ -334,9 +409,7 @@ class GISTool(BaseTool):
         """DEM analysis: elevation, slope, aspect maps."""
         import rasterio
         import numpy as np
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
+        plt = _pyplot()
 
         path = self._resolve_path(input_text)
 
@@ -348,14 +421,12 @@ class GISTool(BaseTool):
             res_x, res_y = src.res
             transform = src.transform
             crs = src.crs
+            profile = src.profile.copy()
 
-        # Calculate slope and aspect
-        dy, dx = np.gradient(elevation, res_y, res_x)
-        slope_rad = np.arctan(np.sqrt(dx**2 + dy**2))
-        slope_deg = np.degrees(slope_rad)
-        aspect_rad = np.arctan2(-dx, dy)
-        aspect_deg = np.degrees(aspect_rad)
-        aspect_deg = (aspect_deg + 360) % 360
+        # Calculate slope, aspect and hillshade (sun at azimuth 315, altitude 45)
+        slope_deg, aspect_deg, hillshade = _slope_aspect_hillshade(
+            elevation, res_x, res_y, azimuth=315, altitude=45
+        )
 
         valid_elev = elevation[~np.isnan(elevation)]
         valid_slope = slope_deg[~np.isnan(slope_deg)]
@@ -377,47 +448,39 @@ class GISTool(BaseTool):
             "Slope classes:",
         ]
 
-        # Slope classification
+        # Slope classification: one digitize + bincount pass.
+        # Bin i holds edges[i - 1] <= slope < edges[i]; 0 and len(edges)
+        # are the out-of-range bins and are left out of the report.
         classes = [
-            ("Flat (0-2)", 0, 2),
-            ("Gentle (2-5)", 2, 5),
-            ("Moderate (5-15)", 5, 15),
-            ("Steep (15-30)", 15, 30),
-            ("Very steep (>30)", 30, 90),
+            "Flat (0-2)",
+            "Gentle (2-5)",
+            "Moderate (5-15)",
+            "Steep (15-30)",
+            "Very steep (>30)",
         ]
+        edges = np.array([0, 2, 5, 15, 30, 90], dtype=valid_slope.dtype)
+        counts = np.bincount(np.digitize(valid_slope, edges), minlength=len(edges) + 1)
         total = valid_slope.size
-        for name, lo, hi in classes:
-            count = np.sum((valid_slope >= lo) & (valid_slope < hi))
+        for name, count in zip(classes, counts[1:len(edges)]):
             pct = count / total * 100 if total > 0 else 0
             lines.append(f"  - {name}: {pct:.1f}%")
 
         # Generate 4-panel figure
         fig, axes = plt.subplots(2, 2, figsize=(14, 12))
 
-        im0 = axes[0, 0].imshow(elevation, cmap="terrain")
+        im0 = _imshow_u8(axes[0, 0], elevation, "terrain")
         axes[0, 0].set_title("Elevation (m)", color="white", fontsize=10)
         plt.colorbar(im0, ax=axes[0, 0], shrink=0.8)
 
-        im1 = axes[0, 1].imshow(slope_deg, cmap="YlOrRd", vmin=0, vmax=45)
+        im1 = _imshow_u8(axes[0, 1], slope_deg, "YlOrRd", vmin=0, vmax=45)
         axes[0, 1].set_title("Slope (degrees)", color="white", fontsize=10)
         plt.colorbar(im1, ax=axes[0, 1], shrink=0.8)
 
-        im2 = axes[1, 0].imshow(aspect_deg, cmap="hsv", vmin=0, vmax=360)
+        im2 = _imshow_u8(axes[1, 0], aspect_deg, "hsv", vmin=0, vmax=360)
         axes[1, 0].set_title("Aspect (degrees)", color="white", fontsize=10)
         plt.colorbar(im2, ax=axes[1, 0], shrink=0.8)
 
-        # Hillshade
-        azimuth = 315
-        altitude = 45
-        az_rad = np.radians(azimuth)
-        alt_rad = np.radians(altitude)
-        hillshade = (
-            np.cos(alt_rad) * np.cos(slope_rad) +
-            np.sin(alt_rad) * np.sin(slope_rad) * np.cos(az_rad - aspect_rad)
-        )
-        hillshade = np.clip(hillshade, 0, 1)
-
-        axes[1, 1].imshow(hillshade, cmap="gray")
+        _imshow_u8(axes[1, 1], hillshade, "gray")
         axes[1, 1].set_title("Hillshade", color="white", fontsize=10)
 
         for ax in axes.flat:
@@ -437,14 +500,8 @@ class GISTool(BaseTool):
         slope_path = OUTPUT_DIR / f"slope_{path.stem}.tif"
         aspect_path = OUTPUT_DIR / f"aspect_{path.stem}.tif"
 
-        with rasterio.open(path) as src:
-            profile = src.profile.copy()
-            profile.update(dtype="float32", count=1)
-
-            with rasterio.open(slope_path, "w", **profile) as dst:
-                dst.write(slope_deg.astype("float32"), 1)
-            with rasterio.open(aspect_path, "w", **profile) as dst:
-                dst.write(aspect_deg.astype("float32"), 1)
+        _write_tiled_band(slope_path, profile, slope_deg)
+        _write_tiled_band(aspect_path, profile, aspect_deg)
 
         lines.extend([
             "",
@@ -460,31 +517,34 @@ class GISTool(BaseTool):
 
     def _buffer(self, input_text: str, **kwargs: Any) -> str:
         """Create buffer zones around geometries."""
-        import geopandas as gpd
-
         path = self._resolve_path(input_text)
         distance = float(kwargs.get("distance", 100))
         layer = kwargs.get("layer")
 
-        gdf = gpd.read_file(path, layer=layer)
-        gdf_m = gdf.to_crs(epsg=3857) if gdf.crs and gdf.crs.is_geographic else gdf
+        gdf = self._read(path, layer=layer)
+        # Buffer geographic data in its local UTM zone: true meters, unlike
+        # Web Mercator, so the area below needs no further reprojection
+        geographic = bool(gdf.crs and gdf.crs.is_geographic)
+        gdf_m = gdf.to_crs(gdf.estimate_utm_crs()) if geographic else gdf
 
         buffered = gdf_m.copy()
         buffered.geometry = gdf_m.geometry.buffer(distance)
+        total_area = buffered.geometry.area.sum()
 
         # Reproject back
-        if gdf.crs and gdf.crs.is_geographic:
+        if geographic:
             buffered = buffered.to_crs(gdf.crs)
 
         # Save output
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        out_path = OUTPUT_DIR / f"buffer_{distance}m_{path.stem}.gpkg"
-        buffered.to_file(out_path, driver="GPKG")
+        ext = self._vector_ext(kwargs)
+        out_path = OUTPUT_DIR / f"buffer_{distance}m_{path.stem}{ext}"
+        self._write(buffered, out_path)
 
         return (
             f"Buffer ({distance}m) created for {len(gdf)} features.\n"
             f"Saved to: {out_path}\n"
-            f"Total buffered area: {buffered.to_crs(epsg=3857).geometry.area.sum():,.2f} m^2"
+            f"Total buffered area: {total_area:,.2f} m^2"
         )
 
     @staticmethod
@@ -507,9 +567,7 @@ class GISTool(BaseTool):
         if coords is not None:
             return self._render_coordinate_map(coords, **kwargs)
 
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
+        plt = _pyplot()
         import numpy as np
 
         path = self._resolve_path(input_text)
@@ -578,12 +636,10 @@ class GISTool(BaseTool):
 
     def _render_vector_map(self, path: Path, title: str, cmap: str, column: str, layer: str | None = None) -> str:
         """Render an interactive map from vector data using GeoJSON."""
-        import geopandas as gpd
-
-        gdf = gpd.read_file(path, layer=layer)
+        gdf = self._read(path, layer=layer)
         geojson_str = self._gdf_to_geojson(gdf)
 
-        geom_types = gdf.geometry.geom_type.value_counts().to_dict()
+        geom_types, _, _ = self._geom_type_summary(gdf)
 
         return (
             f"**Map**: {title}\n"
@@ -599,21 +655,15 @@ class GISTool(BaseTool):
         """Render a map from raster data."""
         import rasterio
         from rasterio.plot import show
-        import numpy as np
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
+        plt = _pyplot()
 
         with rasterio.open(path) as src:
-            data = src.read(1).astype(float)
-            if src.nodata is not None:
-                data[data == src.nodata] = np.nan
-
             fig, ax = plt.subplots(1, 1, figsize=(12, 10))
             ax.set_facecolor("#1a1a2e")
             fig.set_facecolor("#1a1a2e")
 
-            show(src, ax=ax, cmap=cmap, title=title)
+            data, transform = _display_read(src, 1, fig.get_size_inches())
+            show(data, transform=transform, ax=ax, cmap=cmap, title=title)
             ax.set_title(title, color="white", fontsize=14, pad=10)
             ax.tick_params(colors="white", labelsize=8)
             for spine in ax.spines.values():
@@ -648,9 +698,11 @@ class GISTool(BaseTool):
                 transform, width, height = calculate_default_transform(
                     src.crs, target_crs, src.width, src.height, *src.bounds
                 )
-                profile = src.profile.copy()
+                profile = _tiled_profile(src.profile)
                 profile.update(crs=target_crs, transform=transform, width=width, height=height)
 
+                # Band by band keeps memory bounded; GDAL's warper
+                # parallelizes each band across cores
                 out_path = OUTPUT_DIR / f"reproj_{path.stem}.tif"
                 with rasterio.open(out_path, "w", **profile) as dst:
                     for i in range(1, src.count + 1):
@@ -662,18 +714,18 @@ class GISTool(BaseTool):
                             dst_transform=transform,
                             dst_crs=target_crs,
                             resampling=Resampling.bilinear,
+                            num_threads=os.cpu_count() or 1,
+                            warp_mem_limit=512,
                         )
 
             return f"Raster reprojected to {target_crs}.\nSaved to: {out_path}"
 
         else:
-            import geopandas as gpd
-
-            gdf = gpd.read_file(path, layer=layer)
+            gdf = self._read(path, layer=layer)
             gdf_reproj = gdf.to_crs(target_crs)
 
             out_path = OUTPUT_DIR / f"reproj_{path.stem}.gpkg"
-            gdf_reproj.to_file(out_path, driver="GPKG")
+            self._write(gdf_reproj, out_path)
 
             return f"Vector reprojected from {gdf.crs} to {target_crs}.\nSaved to: {out_path}"
 
@@ -681,12 +733,14 @@ class GISTool(BaseTool):
         """Overlay two vector datasets (intersection, union, difference)."""
         import geopandas as gpd
 
-        lines = input_text.strip().splitlines()
-        if len(lines) < 2:
+        # Only the first two lines matter; don't split the whole input
+        first, _, rest = input_text.strip().partition("\n")
+        second = rest.lstrip().partition("\n")[0].strip()
+        if not second:
             return "Provide two file paths (one per line) for overlay."
 
-        path1 = Path(lines[0].strip())
-        path2 = Path(lines[1].strip())
+        path1 = Path(first.strip())
+        path2 = Path(second)
 
         if not path1.exists():
             return f"File not found: {path1}"
@@ -695,18 +749,22 @@ class GISTool(BaseTool):
 
         how = kwargs.get("how", "intersection")
 
-        gdf1 = gpd.read_file(path1)
-        gdf2 = gpd.read_file(path2)
+        gdf1 = self._read(path1)
+        gdf2 = self._read(path2)
 
         # Ensure same CRS
         if gdf1.crs != gdf2.crs:
             gdf2 = gdf2.to_crs(gdf1.crs)
 
-        result = gpd.overlay(gdf1, gdf2, how=how)
+        if how == "difference" and _is_valid_polygon_layer(gdf1) and _is_valid_polygon_layer(gdf2):
+            result = _polygon_difference(gdf1, gdf2)
+        else:
+            result = gpd.overlay(gdf1, gdf2, how=how)
 
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        out_path = OUTPUT_DIR / f"overlay_{how}_{path1.stem}_{path2.stem}.gpkg"
-        result.to_file(out_path, driver="GPKG")
+        ext = self._vector_ext(kwargs)
+        out_path = OUTPUT_DIR / f"overlay_{how}_{path1.stem}_{path2.stem}{ext}"
+        self._write(result, out_path)
 
         return (
             f"Overlay ({how}) complete.\n"
@@ -715,3 +773,408 @@ class GISTool(BaseTool):
             f"- Result: {len(result)} features\n"
             f"Saved to: {out_path}"
         )
+
+
+# ── overlay ─────────────────────────────────────────────────────
+
+
+def _is_valid_polygon_layer(gdf) -> bool:
+    """True when every geometry is a valid (Multi)Polygon."""
+    return bool(
+        gdf.geom_type.isin(("Polygon", "MultiPolygon")).all() and gdf.is_valid.all()
+    )
+
+
+def _polygon_difference(gdf1, gdf2):
+    """``gpd.overlay(gdf1, gdf2, how="difference")`` for valid polygon layers.
+
+    gpd.overlay subtracts each intersecting feature of *gdf2* one at a time
+    in a Python loop. Here an STRtree query finds the candidate pairs, the
+    features cutting each row are unioned, and one vectorized
+    ``shapely.difference`` call does all the subtractions.
+    """
+    import numpy as np
+    import shapely
+
+    geoms1 = np.asarray(gdf1.geometry.values, dtype=object)
+    geoms2 = np.asarray(gdf2.geometry.values, dtype=object)
+
+    result = geoms1.copy()
+    idx1, idx2 = shapely.STRtree(geoms2).query(geoms1, predicate="intersects")
+    if idx1.size:
+        order = np.argsort(idx1, kind="stable")
+        idx1, idx2 = idx1[order], idx2[order]
+        rows, starts = np.unique(idx1, return_index=True)
+        cutters = np.empty(rows.size, dtype=object)
+        cutters[:] = [shapely.union_all(geoms2[group]) for group in np.split(idx2, starts[1:])]
+        result[rows] = shapely.make_valid(shapely.difference(geoms1[rows], cutters))
+
+    keep = ~shapely.is_empty(result)
+    out = gdf1.loc[keep].copy()
+    out[out.geometry.name] = result[keep]
+    return out.reset_index(drop=True)
+
+
+# ── vector I/O ──────────────────────────────────────────────────
+
+
+@functools.cache
+def _arrow_io() -> tuple[bool, bool]:
+    """Whether vector files can be (read, written) through Arrow."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyogrio
+    except ImportError:
+        return False, False
+    # pyogrio's Arrow writer needs GDAL >= 3.8
+    return True, pyogrio.__gdal_version__ >= (3, 8, 0)
+
+
+# ── GeoJSON ─────────────────────────────────────────────────────
+
+
+def _feature_collection(gdf, orjson) -> str:
+    """``gdf.to_json()`` without the per-vertex Python walk.
+
+    Geometries are written by GEOS in one vectorized ``shapely.to_geojson``
+    call and properties by orjson; each feature is spliced together from
+    the encoded pieces in the same key order as geopandas
+    (id, type, properties, geometry). NaN/None properties become null.
+    """
+    import shapely
+
+    geoms = shapely.to_geojson(gdf.geometry.values)
+    props = gdf.drop(columns=gdf.geometry.name).to_dict(orient="records")
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    parts = []
+    for idx, row, geom in zip(gdf.index, props, geoms):
+        parts.append(
+            b'{"id":' + orjson.dumps(str(idx))
+            + b',"type":"Feature","properties":' + orjson.dumps(row, option=option, default=str)
+            + b',"geometry":' + (geom.encode() if geom is not None else b"null")
+            + b"}"
+        )
+    return (b'{"type":"FeatureCollection","features":[' + b",".join(parts) + b"]}").decode()
+
+
+# ── upload index ────────────────────────────────────────────────
+
+
+def _upload_index() -> tuple[dict[str, Path], dict[str, Path]]:
+    """Index files under ``data/uploads`` by basename and by suffix.
+
+    Uploads are stored as ``<project>/<uuid><ext>``, so adding a file bumps
+    the mtime of the root or of one project directory. The index is rebuilt
+    in a single walk only when one of those mtimes changes.
+    """
+    global _UPLOAD_INDEX
+
+    try:
+        root = os.stat(UPLOADS_DIR)
+        with os.scandir(UPLOADS_DIR) as it:
+            signature = (root.st_mtime_ns, *sorted(
+                (e.name, e.stat().st_mtime_ns)
+                for e in it if e.is_dir(follow_symlinks=False)
+            ))
+    except OSError:
+        return {}, {}
+
+    if signature != _UPLOAD_INDEX[0]:
+        by_name: dict[str, Path] = {}
+        by_suffix: dict[str, Path] = {}
+        for dirpath, _dirs, files in os.walk(UPLOADS_DIR):
+            for fname in files:
+                path = Path(dirpath, fname)
+                by_name.setdefault(fname, path)
+                by_suffix.setdefault(path.suffix, path)
+        _UPLOAD_INDEX = (signature, by_name, by_suffix)
+    return _UPLOAD_INDEX[1], _UPLOAD_INDEX[2]
+
+
+# ── plotting ────────────────────────────────────────────────────
+
+
+@functools.cache
+def _pyplot():
+    """matplotlib.pyplot on the Agg backend, selected once per process."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _imshow_u8(ax, data, cmap: str, vmin: float | None = None, vmax: float | None = None):
+    """Draw *data* as a pre-colored RGBA uint8 image.
+
+    Values are quantized to the colormap's 256 LUT entries in one numpy pass
+    (the same binning matplotlib's Normalize uses), so imshow skips its own
+    float normalization. NaNs get the colormap's "bad" color. Returns a
+    ScalarMappable over the original value range for the colorbar.
+    """
+    import matplotlib
+    import numpy as np
+    from matplotlib.cm import ScalarMappable
+    from matplotlib.colors import Normalize
+
+    cm = matplotlib.colormaps[cmap]
+    if cm.N != 256:
+        cm = cm.resampled(256)
+
+    valid = np.isfinite(data)
+    if vmin is None:
+        vmin = float(data[valid].min()) if valid.any() else 0.0
+    if vmax is None:
+        vmax = float(data[valid].max()) if valid.any() else 1.0
+    span = (vmax - vmin) or 1.0
+
+    scaled = (np.asarray(data, dtype=np.float32) - vmin) * (256.0 / span)
+    np.clip(scaled, 0, 255, out=scaled)
+    scaled[~valid] = 0
+    rgba = cm(scaled.astype(np.uint8), bytes=True)
+    rgba[~valid] = np.round(np.asarray(cm.get_bad()) * 255).astype(np.uint8)
+
+    ax.imshow(rgba)
+    return ScalarMappable(norm=Normalize(vmin, vmax), cmap=cm)
+
+
+# ── raster display ──────────────────────────────────────────────
+
+
+def _display_read(src, band: int, fig_size, dpi: int = 150):
+    """Read *band* at roughly the resolution a *fig_size* figure can show.
+
+    Returns (float data with nodata as NaN, transform of the decimated
+    grid). The integer decimation factor lets GDAL serve the read from
+    overviews when the file has them; pixels are averaged, not sampled.
+    """
+    import numpy as np
+    from rasterio.enums import Resampling
+    from rasterio.transform import Affine
+
+    disp_w, disp_h = (max(1, int(v * dpi)) for v in fig_size)
+    factor = max(1, src.width // disp_w, src.height // disp_h)
+    height, width = max(1, src.height // factor), max(1, src.width // factor)
+
+    data = src.read(
+        band, out_shape=(height, width), resampling=Resampling.average, masked=True
+    ).astype(float).filled(np.nan)
+    transform = src.transform * Affine.scale(src.width / width, src.height / height)
+    return data, transform
+
+
+# ── raster statistics ───────────────────────────────────────────
+
+# Pixels per strip read when streaming a band
+_STRIP_PIXELS = 4 * 1024 * 1024
+# Histogram resolution for streamed percentiles
+_PERCENTILE_BINS = 4096
+# Bands with at most this many valid pixels get exact percentiles
+_EXACT_PERCENTILE_PIXELS = 16 * 1024 * 1024
+
+
+def _iter_valid(src, band: int = 1):
+    """Yield a band's valid values (not nodata, not NaN) strip by strip.
+
+    Strips span the full width and are aligned to the block height, so
+    striped and tiled files are both read one block row at a time.
+    """
+    import numpy as np
+    from rasterio.windows import Window
+
+    block_h = src.block_shapes[band - 1][0]
+    rows = max(block_h, _STRIP_PIXELS // max(src.width, 1) // block_h * block_h)
+    nodata = src.nodata
+    for row in range(0, src.height, rows):
+        data = src.read(band, window=Window(0, row, src.width, min(rows, src.height - row)))
+        mask = data != nodata if nodata is not None else np.ones(data.shape, dtype=bool)
+        if data.dtype.kind == "f":
+            mask &= ~np.isnan(data)
+        yield data[mask]
+
+
+def _band_stats(src, band: int = 1, percentiles=(), hist_bins: int = 0) -> dict | None:
+    """Streamed statistics of a raster band; None if it has no valid pixels.
+
+    One pass gives count/min/max/mean/std (merged per strip, Chan et al.).
+    Percentiles and a *hist_bins* histogram need a second pass. Up to
+    _EXACT_PERCENTILE_PIXELS valid pixels the percentiles are exact
+    (np.percentile); larger bands interpolate them from a 4096-bin
+    histogram over [min, max] instead of holding the band, and
+    stats["percentiles_exact"] is False.
+    """
+    import math
+
+    import numpy as np
+
+    n, mean, m2 = 0, 0.0, 0.0
+    lo, hi = math.inf, -math.inf
+    for values in _iter_valid(src, band):
+        if not values.size:
+            continue
+        values = values.astype(np.float64, copy=False)
+        k = values.size
+        m = float(values.mean())
+        delta = m - mean
+        total = n + k
+        m2 += float(((values - m) ** 2).sum()) + delta * delta * n * k / total
+        mean += delta * k / total
+        n = total
+        lo = min(lo, float(values.min()))
+        hi = max(hi, float(values.max()))
+    if n == 0:
+        return None
+
+    stats: dict[str, Any] = {
+        "count": n, "min": lo, "max": hi, "mean": mean, "std": math.sqrt(m2 / n),
+    }
+    if not percentiles and not hist_bins:
+        return stats
+
+    exact = n <= _EXACT_PERCENTILE_PIXELS
+    kept = []
+    fine = np.zeros(_PERCENTILE_BINS, dtype=np.int64)
+    coarse = np.zeros(max(hist_bins, 1), dtype=np.int64)
+    for values in _iter_valid(src, band):
+        if exact:
+            kept.append(values)
+        elif percentiles:
+            fine += np.histogram(values, bins=_PERCENTILE_BINS, range=(lo, hi))[0]
+        if hist_bins:
+            coarse += np.histogram(values, bins=hist_bins, range=(lo, hi))[0]
+
+    stats["percentiles"] = {}
+    stats["percentiles_exact"] = exact
+    if exact and percentiles:
+        values = np.concatenate(kept)
+        del kept
+        for p, v in zip(percentiles, np.percentile(values, percentiles)):
+            stats["percentiles"][p] = float(v)
+        percentiles = ()
+
+    # Linear interpolation on ranks, like np.percentile's default method
+    cdf = np.cumsum(fine)
+    width = (hi - lo) / _PERCENTILE_BINS
+    for p in percentiles:
+        rank = p / 100 * (n - 1)
+        b = int(np.searchsorted(cdf, rank, side="right"))
+        below = cdf[b - 1] if b else 0
+        frac = (rank - below + 0.5) / fine[b] if fine[b] else 0.0
+        stats["percentiles"][p] = min(hi, lo + (b + min(frac, 1.0)) * width)
+    if hist_bins:
+        stats["hist"] = (coarse, np.linspace(lo, hi, hist_bins + 1))
+    return stats
+
+
+# ── raster output ───────────────────────────────────────────────
+
+
+def _tiled_profile(profile: dict) -> dict:
+    """*profile* as a tiled, deflate-compressed GeoTIFF profile."""
+    import numpy as np
+
+    floating = np.dtype(profile["dtype"]).kind == "f"
+    return {
+        **profile,
+        "driver": "GTiff",
+        "tiled": True,
+        "blockxsize": 512,
+        "blockysize": 512,
+        "compress": "deflate",
+        "predictor": 3 if floating else 2,  # floating-point / horizontal
+        "BIGTIFF": "IF_SAFER",
+    }
+
+
+def _write_tiled_band(out_path: Path, profile: dict, data) -> None:
+    """Write a 2-D array as a tiled, compressed float32 GeoTIFF.
+
+    Writes block by block, casting one window at a time, so no full-size
+    float32 copy of *data* is made.
+    """
+    import rasterio
+
+    profile = _tiled_profile({**profile, "dtype": "float32", "count": 1})
+    with rasterio.open(out_path, "w", **profile) as dst:
+        for _, window in dst.block_windows(1):
+            block = data[window.toslices()]
+            dst.write(block.astype("float32", copy=False), 1, window=window)
+
+
+# ── DEM kernels ─────────────────────────────────────────────────
+
+
+def _slope_aspect_hillshade(elevation, res_x: float, res_y: float,
+                            azimuth: float = 315, altitude: float = 45):
+    """Return (slope_deg, aspect_deg, hillshade) for an elevation grid.
+
+    Uses a fused numba kernel (one pass, float32 outputs) when numba is
+    installed, else NumPy. Both take central differences in the interior
+    and one-sided ones on the border, like ``np.gradient``; NaN cells
+    propagate to their neighbours.
+    """
+    import numpy as np
+
+    az_rad = np.radians(azimuth)
+    alt_rad = np.radians(altitude)
+
+    kernel = _dem_kernel()
+    if kernel is not None and min(elevation.shape) >= 2:
+        slope_deg = np.empty(elevation.shape, dtype=np.float32)
+        aspect_deg = np.empty(elevation.shape, dtype=np.float32)
+        hillshade = np.empty(elevation.shape, dtype=np.float32)
+        kernel(elevation, float(res_x), float(res_y), float(az_rad), float(alt_rad),
+               slope_deg, aspect_deg, hillshade)
+        return slope_deg, aspect_deg, hillshade
+
+    dy, dx = np.gradient(elevation, res_y, res_x)
+    slope_rad = np.arctan(np.sqrt(dx**2 + dy**2))
+    slope_deg = np.degrees(slope_rad)
+    aspect_rad = np.arctan2(-dx, dy)
+    aspect_deg = np.degrees(aspect_rad)
+    aspect_deg = (aspect_deg + 360) % 360
+    hillshade = (
+        np.cos(alt_rad) * np.cos(slope_rad) +
+        np.sin(alt_rad) * np.sin(slope_rad) * np.cos(az_rad - aspect_rad)
+    )
+    hillshade = np.clip(hillshade, 0, 1)
+    return slope_deg, aspect_deg, hillshade
+
+
+@functools.cache
+def _dem_kernel():
+    """Compile the fused slope/aspect/hillshade kernel, or None without numba."""
+    try:
+        import numba
+    except ImportError:
+        return None
+    import math
+
+    # fastmath without nnan/ninf: NaN nodata cells must still propagate
+    @numba.njit(parallel=True, cache=True,
+                fastmath={"nsz", "arcp", "contract", "afn", "reassoc"})
+    def kernel(elev, res_x, res_y, az_rad, alt_rad, slope_out, aspect_out, hs_out):
+        h, w = elev.shape
+        cos_alt = math.cos(alt_rad)
+        sin_alt = math.sin(alt_rad)
+        for i in numba.prange(h):
+            i0 = max(i - 1, 0)
+            i1 = min(i + 1, h - 1)
+            for j in range(w):
+                j0 = max(j - 1, 0)
+                j1 = min(j + 1, w - 1)
+                dy = (elev[i1, j] - elev[i0, j]) / ((i1 - i0) * res_y)
+                dx = (elev[i, j1] - elev[i, j0]) / ((j1 - j0) * res_x)
+                s = math.atan(math.sqrt(dx * dx + dy * dy))
+                a = math.atan2(-dx, dy)
+                slope_out[i, j] = math.degrees(s)
+                aspect_out[i, j] = (math.degrees(a) + 360.0) % 360.0
+                hs = cos_alt * math.cos(s) + sin_alt * math.sin(s) * math.cos(az_rad - a)
+                # Comparisons are False for NaN, which passes through
+                if hs < 0.0:
+                    hs = 0.0
+                elif hs > 1.0:
+                    hs = 1.0
+                hs_out[i, j] = hs
+
+    return kernel
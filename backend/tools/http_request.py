@@ -8,7 +8,7 @@ from typing import Any
 
 import httpx
 
-from tools import BaseTool
+from tools import BaseTool, get_http_client
 
 
 class HTTPRequestTool(BaseTool):
@@ -64,14 +64,29 @@ class HTTPRequestTool(BaseTool):
                 body = body_str
 
         try:
-            async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-                if isinstance(body, dict):
-                    resp = await client.request(method, url, headers=headers, json=body)
-                elif body:
-                    headers.setdefault("Content-Type", "text/plain")
-                    resp = await client.request(method, url, headers=headers, content=str(body))
-                else:
-                    resp = await client.request(method, url, headers=headers)
+            client = get_http_client()
+            if isinstance(body, dict):
+                request = client.build_request(method, url, headers=headers, json=body, timeout=timeout)
+            elif body:
+                headers.setdefault("Content-Type", "text/plain")
+                request = client.build_request(
+                    method, url, headers=headers, content=str(body), timeout=timeout
+                )
+            else:
+                request = client.build_request(method, url, headers=headers, timeout=timeout)
+
+            # Stream the body and stop once there is more than can be shown
+            cap = self.MAX_OUTPUT * 2
+            buf = bytearray()
+            resp = await client.send(request, stream=True, follow_redirects=True)
+            try:
+                async for chunk in resp.aiter_bytes(chunk_size=65536):
+                    buf += chunk
+                    if len(buf) > cap:
+                        break
+                complete = len(buf) <= cap
+            finally:
+                await resp.aclose()
 
             # Format output
             lines = [
@@ -84,16 +99,23 @@ class HTTPRequestTool(BaseTool):
             lines.append(f"Content-Type: {ct}")
             lines.append("")
 
-            # Response body
-            text = resp.text
-            if len(text) > self.MAX_OUTPUT:
-                text = text[: self.MAX_OUTPUT] + f"\n\n... (truncated, {len(resp.text)} total chars)"
+            # Response body, decoded once
+            raw = bytes(buf)
+            del buf
+            text = raw.decode(resp.charset_encoding or "utf-8", errors="replace")
+            if not complete:
+                total = resp.headers.get("content-length")
+                size = f"{total} total bytes" if total else f"over {cap} bytes"
+                text = text[: self.MAX_OUTPUT] + f"\n\n... (truncated, {size})"
+            elif len(text) > self.MAX_OUTPUT:
+                text = text[: self.MAX_OUTPUT] + f"\n\n... (truncated, {len(text)} total chars)"
+
+            # Try to pretty-print JSON (only a complete body can parse)
+            if "json" in ct and complete:
+                from tools.file_processor import _json_pretty
 
-            # Try to pretty-print JSON
-            if "json" in ct:
                 try:
-                    parsed_json = resp.json()
-                    text = json.dumps(parsed_json, indent=2, ensure_ascii=False)
+                    text = _json_pretty(raw)
                     if len(text) > self.MAX_OUTPUT:
                         text = text[: self.MAX_OUTPUT] + "\n... (truncated)"
                 except Exception:
@@ -2,11 +2,128 @@
 
 from __future__ import annotations
 
-import base64
+import asyncio
+import functools
+import hashlib
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator
 
-from tools import BaseTool
+from tools import BaseTool, register_shutdown
+
+logger = logging.getLogger("gennaro.image_tool")
+
+# Read size for streamed hashing/base64; a multiple of 3 so no chunk but
+# the last one ends in padding
+_B64_CHUNK = 57 * 1024
+
+
+@functools.lru_cache(maxsize=64)
+def _read_image(path: str, mtime_ns: int, size: int, inline: bool) -> tuple[str, str | None]:
+    """Return (sha256 hex, base64 or None) of an image file in one pass.
+
+    The file is read in chunks; with *inline* each chunk is also base64
+    encoded into one preallocated buffer, using pybase64's SIMD encoder
+    when installed. Cached per file version: *mtime_ns* and *size* are
+    only part of the key.
+    """
+    try:
+        from pybase64 import b64encode
+    except ImportError:
+        from base64 import b64encode
+
+    digest = hashlib.sha256()
+    out = bytearray(4 * -(-size // 3)) if inline else None
+    pos = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(_B64_CHUNK):
+            digest.update(chunk)
+            if out is not None:
+                encoded = b64encode(chunk)
+                out[pos:pos + len(encoded)] = encoded
+                pos += len(encoded)
+    if out is None:
+        return digest.hexdigest(), None
+    del out[pos:]
+    return digest.hexdigest(), out.decode("ascii")
+
+
+# Vision answers keyed by (image sha256, prompt, model); least recently
+# used first, evicted past _RESPONSE_CACHE_SIZE
+_RESPONSES: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+_RESPONSE_CACHE_SIZE = 128
+
+
+# Images above this size are uploaded through the provider's Files API and
+# referenced by id instead of inlined as base64 (~1.33x larger) in the body;
+# each upload is deleted again once its vision request returns
+_UPLOAD_THRESHOLD = 256 * 1024
+_ANTHROPIC_FILES_BETA = "files-api-2025-04-14"
+
+
+# Provider SDK clients, shared by every call so their HTTP connection
+# pools (and TLS sessions) are reused; created on first use
+_ANTHROPIC_CLIENT: Any = None
+_OPENAI_CLIENT: Any = None
+
+# Images analyzed at once by ImageTool.batch_execute
+_BATCH_CONCURRENCY = 8
+
+
+def _anthropic_client() -> Any:
+    global _ANTHROPIC_CLIENT
+    if _ANTHROPIC_CLIENT is None:
+        import anthropic
+        from config import settings
+
+        _ANTHROPIC_CLIENT = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+        register_shutdown(_close_clients)
+    return _ANTHROPIC_CLIENT
+
+
+def _openai_client() -> Any:
+    global _OPENAI_CLIENT
+    if _OPENAI_CLIENT is None:
+        from openai import AsyncOpenAI
+        from config import settings
+
+        _OPENAI_CLIENT = AsyncOpenAI(api_key=settings.openai_api_key)
+        register_shutdown(_close_clients)
+    return _OPENAI_CLIENT
+
+
+async def _close_clients() -> None:
+    global _ANTHROPIC_CLIENT, _OPENAI_CLIENT
+    for client in (_ANTHROPIC_CLIENT, _OPENAI_CLIENT):
+        if client is not None:
+            await client.close()
+    _ANTHROPIC_CLIENT = _OPENAI_CLIENT = None
+
+
+@asynccontextmanager
+async def _uploaded_image(provider: str, client: Any, path: Path, media_type: str) -> AsyncIterator[str]:
+    """Upload *path* to the provider's Files API for one request.
+
+    Yields the file id; the file is deleted from the provider on exit.
+    """
+    data = await asyncio.to_thread(path.read_bytes)
+    if provider == "anthropic":
+        uploaded = await client.beta.files.upload(file=(path.name, data, media_type))
+    else:
+        uploaded = await client.files.create(file=(path.name, data, media_type), purpose="vision")
+    del data
+    try:
+        yield uploaded.id
+    finally:
+        try:
+            if provider == "anthropic":
+                await client.beta.files.delete(uploaded.id)
+            else:
+                await client.files.delete(uploaded.id)
+        except Exception as e:
+            logger.warning("Could not delete uploaded image %s from %s: %s", uploaded.id, provider, e)
 
 
 class ImageTool(BaseTool):
@@ -26,28 +143,65 @@ class ImageTool(BaseTool):
 
         return f"No valid image file found at: {input_text}"
 
+    async def batch_execute(self, inputs: list[str], **kwargs: Any) -> list[str]:
+        """Run execute() over several images concurrently, in input order.
+
+        At most _BATCH_CONCURRENCY requests are in flight at a time.
+        """
+        sem = asyncio.Semaphore(_BATCH_CONCURRENCY)
+
+        async def one(input_text: str) -> str:
+            async with sem:
+                return await self.execute(input_text, **kwargs)
+
+        return list(await asyncio.gather(*(one(text) for text in inputs)))
+
     async def _analyze_image_file(self, path: Path, prompt: str, model: str) -> str:
-        """Encode image and send to a vision model."""
-        image_data = base64.b64encode(path.read_bytes()).decode()
+        """Encode or upload the image and send it to a vision model."""
         media_type = self._get_media_type(path.suffix)
 
         from orchestrator.router import get_provider_for_model
         from models.agent_models import Provider
 
         provider = get_provider_for_model(model)
+        if provider not in (Provider.ANTHROPIC, Provider.OPENAI):
+            return "Vision analysis requires an Anthropic or OpenAI model."
+
+        # Small images go inline: one request beats upload + request
+        st = path.stat()
+        inline = st.st_size <= _UPLOAD_THRESHOLD
+        sha, image_data = await asyncio.to_thread(
+            _read_image, str(path.resolve()), st.st_mtime_ns, st.st_size, inline
+        )
+
+        # Same image, prompt and model as a recent call: reuse the answer
+        key = (sha, prompt, model)
+        cached = _RESPONSES.get(key)
+        if cached is not None:
+            _RESPONSES.move_to_end(key)
+            return cached
 
         if provider == Provider.ANTHROPIC:
-            return await self._analyze_with_anthropic(image_data, media_type, prompt, model)
-        if provider == Provider.OPENAI:
-            return await self._analyze_with_openai(image_data, media_type, prompt, model)
+            try:
+                text = await self._analyze_with_anthropic(path, image_data, media_type, prompt, model)
+            except Exception as e:
+                return f"Anthropic vision error: {e}"
+        else:
+            try:
+                text = await self._analyze_with_openai(path, image_data, media_type, prompt, model)
+            except Exception as e:
+                return f"OpenAI vision error: {e}"
 
-        return "Vision analysis requires an Anthropic or OpenAI model."
+        _RESPONSES[key] = text
+        if len(_RESPONSES) > _RESPONSE_CACHE_SIZE:
+            _RESPONSES.popitem(last=False)
+        return text
 
-    async def _analyze_with_anthropic(self, b64_data: str, media_type: str, prompt: str, model: str) -> str:
-        try:
-            import anthropic
-            from config import settings
-            client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+    async def _analyze_with_anthropic(
+        self, path: Path, b64_data: str | None, media_type: str, prompt: str, model: str
+    ) -> str:
+        client = _anthropic_client()
+        if b64_data is not None:
             message = await client.messages.create(
                 model=model,
                 max_tokens=1024,
@@ -60,14 +214,27 @@ class ImageTool(BaseTool):
                 }],
             )
             return message.content[0].text
-        except Exception as e:
-            return f"Anthropic vision error: {e}"
 
-    async def _analyze_with_openai(self, b64_data: str, media_type: str, prompt: str, model: str) -> str:
-        try:
-            from openai import AsyncOpenAI
-            from config import settings
-            client = AsyncOpenAI(api_key=settings.openai_api_key)
+        async with _uploaded_image("anthropic", client, path, media_type) as file_id:
+            message = await client.beta.messages.create(
+                model=model,
+                max_tokens=1024,
+                messages=[{
+                    "role": "user",
+                    "content": [
+                        {"type": "image", "source": {"type": "file", "file_id": file_id}},
+                        {"type": "text", "text": prompt},
+                    ],
+                }],
+                betas=[_ANTHROPIC_FILES_BETA],
+            )
+        return message.content[0].text
+
+    async def _analyze_with_openai(
+        self, path: Path, b64_data: str | None, media_type: str, prompt: str, model: str
+    ) -> str:
+        client = _openai_client()
+        if b64_data is not None:
             resp = await client.chat.completions.create(
                 model=model,
                 max_tokens=1024,
@@ -80,8 +247,22 @@ class ImageTool(BaseTool):
                 }],
             )
             return resp.choices[0].message.content or ""
-        except Exception as e:
-            return f"OpenAI vision error: {e}"
+
+        # Chat Completions only takes images inline; file ids go
+        # through the Responses API
+        async with _uploaded_image("openai", client, path, media_type) as file_id:
+            resp = await client.responses.create(
+                model=model,
+                max_output_tokens=1024,
+                input=[{
+                    "role": "user",
+                    "content": [
+                        {"type": "input_image", "file_id": file_id},
+                        {"type": "input_text", "text": prompt},
+                    ],
+                }],
+            )
+        return resp.output_text or ""
 
     def _get_media_type(self, suffix: str) -> str:
         return {
@@ -3,14 +3,122 @@
 from __future__ import annotations
 
 import csv
+import functools
 import io
 import json
 import re
+from collections import deque
+from itertools import islice
 from typing import Any
 
 from tools import BaseTool
 
 
+def _loads(text: str) -> tuple[Any, bool]:
+    """json.loads through orjson when available; returns (data, via_orjson).
+
+    Input orjson rejects but the stdlib accepts (NaN, >64-bit ints) falls
+    back to the stdlib, which also produces the error for invalid JSON.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return json.loads(text), False
+    try:
+        return orjson.loads(text), True
+    except orjson.JSONDecodeError:
+        return json.loads(text), False
+
+
+def _dumps(value: Any, indent: bool = True, fast: bool = True) -> str:
+    """Serialize *value* indented by 2 (or minified), non-ASCII kept as is.
+
+    *fast* allows orjson; pass False for data the stdlib parsed, since
+    orjson would write its NaN/Infinity as null.
+    """
+    if fast:
+        try:
+            import orjson
+        except ImportError:
+            pass
+        else:
+            try:
+                return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+            except orjson.JSONEncodeError:
+                pass
+    if indent:
+        return json.dumps(value, indent=2, ensure_ascii=False)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+# validate streams documents at least this large instead of loading them
+_STREAM_VALIDATE_CHARS = 64 * 1024
+
+
+def _stream_top_level(text: str) -> tuple[str, int, list[str]] | None:
+    """Count the top-level items of a JSON array/object with ijson.
+
+    Only one top-level item is materialized at a time. Returns (kind,
+    count, first 10 keys), or None when ijson is missing or rejects the
+    input; the caller then loads it normally, which also accepts the
+    stdlib's extensions (NaN) and gives its positioned error messages.
+    """
+    try:
+        import ijson
+    except ImportError:
+        return None
+    try:
+        raw = text.encode("utf-8")
+        if text[0] == "[":
+            return "array", sum(1 for _ in ijson.items(raw, "item")), []
+        keys = {k: None for k, _ in ijson.kvitems(raw, "")}
+        return "object", len(keys), list(islice(keys, 10))
+    except (ijson.JSONError, UnicodeEncodeError):
+        return None
+
+
+_KEY_IDX = re.compile(r'^(\w+)\[(\d+)\]$')
+_IDX = re.compile(r'^\[(\d+)\]$')
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_path(path: str) -> tuple[tuple[Any, ...], ...]:
+    """Parse a dot-notation path once into ("key_idx", key, i), ("idx", i)
+    and ("name", part) steps; repeated extracts skip the regexes."""
+    ops: list[tuple[Any, ...]] = []
+    for part in path.split("."):
+        if not part:
+            continue
+        if match := _KEY_IDX.match(part):
+            ops.append(("key_idx", match.group(1), int(match.group(2))))
+        elif match := _IDX.match(part):
+            ops.append(("idx", int(match.group(1))))
+        else:
+            ops.append(("name", part))
+    return tuple(ops)
+
+
+def _iter_flatten(data: Any, prefix: str, sep: str):
+    """Yield (flat key, leaf value) depth-first, in document order.
+
+    Walks an explicit stack, so memory is O(depth) rather than O(leaves)
+    and deep documents cannot hit the recursion limit. Lists contribute
+    their first 50 elements.
+    """
+    stack = deque([(data, prefix)])
+    while stack:
+        node, key = stack.pop()
+        if isinstance(node, dict):
+            children = [(v, f"{key}{sep}{k}" if key else k) for k, v in node.items()]
+        elif isinstance(node, list):
+            children = [(v, f"{key}[{i}]") for i, v in enumerate(islice(node, 50))]
+        else:
+            yield key, node
+            continue
+        # Reversed, so the first child is popped first
+        stack.extend(reversed(children))
+
+
 class JSONParserTool(BaseTool):
     """Parse and transform JSON: extract fields, filter arrays, flatten, convert to CSV."""
 
@@ -30,27 +138,27 @@ class JSONParserTool(BaseTool):
 
         # Parse JSON
         try:
-            data = json.loads(text)
+            data, fast = _loads(text)
         except json.JSONDecodeError as e:
             return f"[json_parser] Invalid JSON: {e}"
 
         if operation == "extract":
-            return self._extract(data, path)
+            return self._extract(data, path, fast)
         if operation == "keys":
             return self._keys(data)
         if operation == "filter":
-            return self._filter(data, filter_field, filter_value)
+            return self._filter(data, filter_field, filter_value, fast)
         if operation == "flatten":
             return self._flatten(data)
         if operation == "to_csv":
             return self._to_csv(data)
         if operation == "pretty":
-            result = json.dumps(data, indent=2, ensure_ascii=False)
+            result = _dumps(data, fast=fast)
             if len(result) > 10_000:
                 result = result[:10_000] + "\n... (truncated)"
             return result
         if operation == "minify":
-            return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+            return _dumps(data, indent=False, fast=fast)
         if operation == "count":
             if isinstance(data, list):
                 return f"Array with {len(data)} elements"
@@ -61,8 +169,15 @@ class JSONParserTool(BaseTool):
         return f"[json_parser] Unknown operation: {operation}"
 
     def _validate(self, text: str) -> str:
+        if len(text) >= _STREAM_VALIDATE_CHARS and text[0] in "[{":
+            streamed = _stream_top_level(text)
+            if streamed is not None:
+                kind, count, keys = streamed
+                if kind == "array":
+                    return f"Valid JSON: array with {count} elements"
+                return f"Valid JSON: object with {count} keys ({', '.join(keys)})"
         try:
-            data = json.loads(text)
+            data, _ = _loads(text)
             dtype = type(data).__name__
             if isinstance(data, list):
                 return f"Valid JSON: array with {len(data)} elements"
@@ -72,14 +187,14 @@ class JSONParserTool(BaseTool):
         except json.JSONDecodeError as e:
             return f"Invalid JSON at position {e.pos}: {e.msg}"
 
-    def _extract(self, data: Any, path: str) -> str:
+    def _extract(self, data: Any, path: str, fast: bool = True) -> str:
         if not path:
             return "[json_parser] No path provided. Use dot notation: data.items[0].name"
 
         try:
             value = self._resolve_path(data, path)
             if isinstance(value, (dict, list)):
-                result = json.dumps(value, indent=2, ensure_ascii=False)
+                result = _dumps(value, fast=fast)
                 if len(result) > 10_000:
                     result = result[:10_000] + "\n... (truncated)"
                 return result
@@ -89,28 +204,22 @@ class JSONParserTool(BaseTool):
 
     def _resolve_path(self, data: Any, path: str) -> Any:
         """Resolve a dot-notation path like 'data.items[0].name'."""
-        # Split on dots but respect array indices
-        parts = re.split(r'\.', path)
         current = data
-        for part in parts:
-            if not part:
-                continue
-            # Check for array index: key[0]
-            match = re.match(r'^(\w+)\[(\d+)\]$', part)
-            if match:
-                key, idx = match.group(1), int(match.group(2))
+        for op in _compile_path(path):
+            kind = op[0]
+            if kind == "key_idx":
+                # key[0]
                 if isinstance(current, dict):
-                    current = current[key]
-                current = current[idx]
-            elif re.match(r'^\[\d+\]$', part):
-                idx = int(part[1:-1])
-                current = current[idx]
+                    current = current[op[1]]
+                current = current[op[2]]
+            elif kind == "idx":
+                current = current[op[1]]
             elif isinstance(current, dict):
-                current = current[part]
-            elif isinstance(current, list) and part.isdigit():
-                current = current[int(part)]
+                current = current[op[1]]
+            elif isinstance(current, list) and op[1].isdigit():
+                current = current[int(op[1])]
             else:
-                raise KeyError(f"Cannot access '{part}' on {type(current).__name__}")
+                raise KeyError(f"Cannot access '{op[1]}' on {type(current).__name__}")
         return current
 
     def _keys(self, data: Any) -> str:
@@ -128,53 +237,44 @@ class JSONParserTool(BaseTool):
             return f"Array with {len(data)} elements (not objects)"
         return f"Not an object or array: {type(data).__name__}"
 
-    def _filter(self, data: Any, field: str, value: str) -> str:
+    def _filter(self, data: Any, field: str, value: str, fast: bool = True) -> str:
         if not isinstance(data, list):
             return "[json_parser] Filter requires a JSON array as input."
         if not field:
             return "[json_parser] No filter_field provided."
 
-        results = []
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-            item_val = str(item.get(field, ""))
-            if value.lower() in item_val.lower():
-                results.append(item)
+        # Lowercase the needle once; str() only non-string field values
+        needle = value.lower()
+        results = [
+            item for item in data
+            if isinstance(item, dict)
+            and needle in (
+                v if isinstance(v := item.get(field, ""), str) else str(v)
+            ).lower()
+        ]
 
         if not results:
             return f"[json_parser] No items match {field} containing '{value}'"
 
-        output = json.dumps(results, indent=2, ensure_ascii=False)
+        output = _dumps(results, fast=fast)
         if len(output) > 10_000:
             output = output[:10_000] + f"\n... (truncated, {len(results)} matches total)"
         return f"Filtered: {len(results)} of {len(data)} items match {field}='{value}'\n\n{output}"
 
     def _flatten(self, data: Any, prefix: str = "", sep: str = ".") -> str:
-        flat = self._flatten_recursive(data, prefix, sep)
-        if not flat:
+        leaves = _iter_flatten(data, prefix, sep)
+        rows = list(islice(leaves, 200))
+        if not rows:
             return "[json_parser] Nothing to flatten."
         lines = ["| Key | Value |", "| --- | --- |"]
-        for k, v in list(flat.items())[:200]:
+        for k, v in rows:
             lines.append(f"| {k} | {str(v)[:100]} |")
-        if len(flat) > 200:
-            lines.append(f"\n... ({len(flat) - 200} more)")
+        # Count the rest without keeping it
+        more = sum(1 for _ in leaves)
+        if more:
+            lines.append(f"\n... ({more} more)")
         return "\n".join(lines)
 
-    def _flatten_recursive(self, data: Any, prefix: str, sep: str) -> dict[str, Any]:
-        items: dict[str, Any] = {}
-        if isinstance(data, dict):
-            for k, v in data.items():
-                new_key = f"{prefix}{sep}{k}" if prefix else k
-                items.update(self._flatten_recursive(v, new_key, sep))
-        elif isinstance(data, list):
-            for i, v in enumerate(data[:50]):
-                new_key = f"{prefix}[{i}]"
-                items.update(self._flatten_recursive(v, new_key, sep))
-        else:
-            items[prefix] = data
-        return items
-
     def _to_csv(self, data: Any) -> str:
         if not isinstance(data, list):
             return "[json_parser] to_csv requires a JSON array of objects."
@@ -182,21 +282,19 @@ class JSONParserTool(BaseTool):
             return "[json_parser] Array items must be objects."
 
         # Collect all keys
-        all_keys: list[str] = []
-        seen: set[str] = set()
-        for item in data:
-            if isinstance(item, dict):
-                for k in item.keys():
-                    if k not in seen:
-                        all_keys.append(k)
-                        seen.add(k)
+        # dict keys keep first-seen order; one insert per key, no seen set
+        all_keys = list({k: None for item in data if isinstance(item, dict) for k in item})
 
+        # Plain csv.writer rows: DictWriter would build a dict per row and
+        # check it for extra keys before handing a list to the C writer
         output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=all_keys)
-        writer.writeheader()
-        for item in data[:500]:
-            if isinstance(item, dict):
-                writer.writerow({k: str(item.get(k, "")) for k in all_keys})
+        writer = csv.writer(output)
+        writer.writerow(all_keys)
+        writer.writerows(
+            [str(item.get(k, "")) for k in all_keys]
+            for item in islice(data, 500)
+            if isinstance(item, dict)
+        )
 
         result = output.getvalue()
         if len(data) > 500:
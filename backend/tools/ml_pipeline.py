@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
+import inspect
 import io
 import json
 import os
-import pickle
 from pathlib import Path
 from typing import Any
 
@@ -14,6 +15,92 @@ from tools import BaseTool
 MODELS_DIR = Path("data/models")
 
 
+def _save_bundle(model_path: Path, model: Any, meta: dict[str, Any]) -> None:
+    """Save a model bundle with joblib, plus its meta as a JSON sidecar.
+
+    Compressed with lz4 when installed (fast to load), zlib level 3
+    otherwise. The sidecar lets list_models skip loading the model.
+    """
+    import joblib
+
+    try:
+        import lz4  # noqa: F401
+        compress: Any = ("lz4", 3)
+    except ImportError:
+        compress = 3
+    joblib.dump({"model": model, "meta": meta}, model_path, compress=compress)
+    model_path.with_suffix(".meta.json").write_text(json.dumps(meta))
+
+
+def _load_bundle(model_path: Path) -> dict[str, Any]:
+    """Load a bundle written by _save_bundle; older uncompressed files load too."""
+    import joblib
+
+    return joblib.load(model_path)
+
+
+def _parse_csv(data: bytes) -> Any:
+    """Parse CSV bytes into a DataFrame, with pyarrow's reader when available.
+
+    Arrow's multithreaded parser is several times faster than pandas' on
+    large inputs. Inferred dates are cast back to strings and empty strings
+    read as null so the frame matches what pd.read_csv gives; inputs Arrow
+    rejects (e.g. ragged rows) go through pandas.
+    """
+    import pandas as pd
+
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        return pd.read_csv(io.BytesIO(data))
+    try:
+        table = pacsv.read_csv(
+            pa.py_buffer(data),
+            convert_options=pacsv.ConvertOptions(strings_can_be_null=True),
+        )
+    except pa.ArrowInvalid:
+        return pd.read_csv(io.BytesIO(data))
+    for i, field in enumerate(table.schema):
+        if pa.types.is_temporal(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _read_csv(input_text: str) -> Any:
+    """CSV text, or else a path to a CSV file, as a DataFrame (None if neither)."""
+    try:
+        return _parse_csv(input_text.encode("utf-8"))
+    except Exception:
+        path = Path(input_text.strip())
+        if path.is_file():
+            return _parse_csv(path.read_bytes())
+        return None
+
+
+def _encode_categoricals(df: Any, exclude: str | None = None) -> None:
+    """Replace object/category columns of *df* with integer codes, in place.
+
+    pd.factorize(sort=True) is one hash pass per column and gives the same
+    codes as astype("category").cat.codes, as int32.
+    """
+    import pandas as pd
+
+    cols = df.select_dtypes(include=["object", "category"]).columns
+    if exclude is not None:
+        cols = cols.drop(exclude, errors="ignore")
+    if len(cols):
+        df[cols] = df[cols].apply(lambda s: pd.factorize(s, sort=True)[0].astype("int32"))
+
+
+def _load_meta(model_path: Path) -> dict[str, Any]:
+    """A saved model's meta, from its sidecar when there is one."""
+    sidecar = model_path.with_suffix(".meta.json")
+    if sidecar.exists():
+        return json.loads(sidecar.read_text())
+    return _load_bundle(model_path)["meta"]
+
+
 class MLPipelineTool(BaseTool):
     """Train, predict, and evaluate ML models from CSV data."""
 
@@ -23,18 +110,20 @@ class MLPipelineTool(BaseTool):
     async def execute(self, input_text: str, **kwargs: Any) -> str:
         operation = kwargs.get("operation", "train")
 
+        # Fitting, predicting and loading models are CPU-bound: keep them off
+        # the event loop
         if operation == "train":
-            return self._train(input_text, **kwargs)
+            return await asyncio.to_thread(self._train_sync, input_text, **kwargs)
         if operation == "predict":
-            return self._predict(input_text, **kwargs)
+            return await asyncio.to_thread(self._predict_sync, input_text, **kwargs)
         if operation == "evaluate":
-            return self._evaluate(input_text, **kwargs)
+            return await asyncio.to_thread(self._evaluate_sync, input_text, **kwargs)
         if operation == "list_models":
-            return self._list_models()
+            return await asyncio.to_thread(self._list_models)
 
         return f"Unknown operation: {operation}. Use train, predict, evaluate, or list_models."
 
-    def _train(self, input_text: str, **kwargs: Any) -> str:
+    def _train_sync(self, input_text: str, **kwargs: Any) -> str:
         """Train a model from CSV data."""
         try:
             import pandas as pd
@@ -48,16 +137,10 @@ class MLPipelineTool(BaseTool):
         model_name = kwargs.get("model_name", "model")
         test_size = float(kwargs.get("test_size", 0.2))
 
-        # Parse CSV from input
-        try:
-            df = pd.read_csv(io.StringIO(input_text))
-        except Exception:
-            # Try loading from file path
-            path = Path(input_text.strip())
-            if path.exists():
-                df = pd.read_csv(path)
-            else:
-                return "Could not parse input as CSV. Provide CSV text or a file path."
+        # Parse CSV from input (or a file path)
+        df = _read_csv(input_text)
+        if df is None:
+            return "Could not parse input as CSV. Provide CSV text or a file path."
 
         if not target_column:
             target_column = df.columns[-1]
@@ -70,8 +153,7 @@ class MLPipelineTool(BaseTool):
         y = df[target_column]
 
         # Auto-encode categorical columns
-        for col in X.select_dtypes(include=['object', 'category']).columns:
-            X[col] = X[col].astype('category').cat.codes
+        _encode_categoricals(X)
 
         # Determine task type
         is_classification = y.dtype == 'object' or y.nunique() < 20
@@ -86,7 +168,10 @@ class MLPipelineTool(BaseTool):
         )
 
         # Create model
-        model = self._create_model(model_type, is_classification)
+        try:
+            model = self._create_model(model_type, is_classification)
+        except ValueError as e:
+            return str(e)
         model.fit(X_train, y_train)
 
         # Evaluate
@@ -105,8 +190,7 @@ class MLPipelineTool(BaseTool):
             "test_score": round(test_score, 4),
             "n_samples": len(df),
         }
-        with open(model_path, "wb") as f:
-            pickle.dump({"model": model, "meta": meta}, f)
+        _save_bundle(model_path, model, meta)
 
         lines = [
             f"Model trained successfully: **{model_name}**",
@@ -130,7 +214,7 @@ class MLPipelineTool(BaseTool):
 
         return "\n".join(lines)
 
-    def _predict(self, input_text: str, **kwargs: Any) -> str:
+    def _predict_sync(self, input_text: str, **kwargs: Any) -> str:
         """Make predictions with a saved model."""
         try:
             import pandas as pd
@@ -143,24 +227,17 @@ class MLPipelineTool(BaseTool):
         if not model_path.exists():
             return f"Model '{model_name}' not found. Available: {self._list_model_names()}"
 
-        with open(model_path, "rb") as f:
-            bundle = pickle.load(f)
+        bundle = _load_bundle(model_path)
 
         model = bundle["model"]
         meta = bundle["meta"]
 
-        try:
-            df = pd.read_csv(io.StringIO(input_text))
-        except Exception:
-            path = Path(input_text.strip())
-            if path.exists():
-                df = pd.read_csv(path)
-            else:
-                return "Could not parse input as CSV."
+        df = _read_csv(input_text)
+        if df is None:
+            return "Could not parse input as CSV."
 
         # Ensure same features
-        for col in df.select_dtypes(include=['object', 'category']).columns:
-            df[col] = df[col].astype('category').cat.codes
+        _encode_categoricals(df)
 
         missing = set(meta["features"]) - set(df.columns)
         if missing:
@@ -175,7 +252,7 @@ class MLPipelineTool(BaseTool):
         output = results.to_string(index=False, max_rows=50)
         return f"Predictions ({len(predictions)} rows):\n\n{output}"
 
-    def _evaluate(self, input_text: str, **kwargs: Any) -> str:
+    def _evaluate_sync(self, input_text: str, **kwargs: Any) -> str:
         """Evaluate a model against labeled data."""
         try:
             import pandas as pd
@@ -189,28 +266,20 @@ class MLPipelineTool(BaseTool):
         if not model_path.exists():
             return f"Model '{model_name}' not found."
 
-        with open(model_path, "rb") as f:
-            bundle = pickle.load(f)
+        bundle = _load_bundle(model_path)
 
         model = bundle["model"]
         meta = bundle["meta"]
 
-        try:
-            df = pd.read_csv(io.StringIO(input_text))
-        except Exception:
-            path = Path(input_text.strip())
-            if path.exists():
-                df = pd.read_csv(path)
-            else:
-                return "Could not parse input as CSV."
+        df = _read_csv(input_text)
+        if df is None:
+            return "Could not parse input as CSV."
 
         target = meta["target"]
         if target not in df.columns:
             return f"Target column '{target}' not found."
 
-        for col in df.select_dtypes(include=['object', 'category']).columns:
-            if col != target:
-                df[col] = df[col].astype('category').cat.codes
+        _encode_categoricals(df, exclude=target)
 
         X = df[meta["features"]]
         y = df[target]
@@ -237,9 +306,7 @@ class MLPipelineTool(BaseTool):
         lines = ["Saved models:"]
         for mp in models:
             try:
-                with open(mp, "rb") as f:
-                    bundle = pickle.load(f)
-                meta = bundle["meta"]
+                meta = _load_meta(mp)
                 lines.append(f"- **{mp.stem}**: {meta['model_type']} ({meta['task']}) — test score: {meta['test_score']:.4f}")
             except Exception:
                 lines.append(f"- **{mp.stem}**: (corrupted)")
@@ -252,7 +319,14 @@ class MLPipelineTool(BaseTool):
 
     def _create_model(self, model_type: str, is_classification: bool):
         """Create a scikit-learn model instance."""
-        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, GradientBoostingClassifier, GradientBoostingRegressor
+        from sklearn.ensemble import (
+            GradientBoostingClassifier,
+            GradientBoostingRegressor,
+            HistGradientBoostingClassifier,
+            HistGradientBoostingRegressor,
+            RandomForestClassifier,
+            RandomForestRegressor,
+        )
         from sklearn.linear_model import LogisticRegression, LinearRegression
         from sklearn.svm import SVC, SVR
         from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
@@ -260,11 +334,28 @@ class MLPipelineTool(BaseTool):
         models = {
             "random_forest": (RandomForestClassifier, RandomForestRegressor),
             "gradient_boosting": (GradientBoostingClassifier, GradientBoostingRegressor),
+            # Histogram-binned boosting: splits scan bins, not sorted samples
+            "hist_gb": (HistGradientBoostingClassifier, HistGradientBoostingRegressor),
             "linear": (LogisticRegression, LinearRegression),
             "svm": (SVC, SVR),
             "knn": (KNeighborsClassifier, KNeighborsRegressor),
         }
+        if model_type == "lightgbm":
+            try:
+                from lightgbm import LGBMClassifier, LGBMRegressor
+            except ImportError:
+                raise ValueError("lightgbm is not installed. Install with: pip install lightgbm") from None
+            models["lightgbm"] = (LGBMClassifier, LGBMRegressor)
 
         pair = models.get(model_type, models["random_forest"])
         cls = pair[0] if is_classification else pair[1]
-        return cls(random_state=42) if 'random_state' in cls().get_params() else cls()
+        # Read the constructor's parameters off its signature instead of
+        # building a throwaway instance for get_params()
+        params = inspect.signature(cls).parameters
+        kwargs: dict[str, Any] = {}
+        if 'random_state' in params:
+            kwargs["random_state"] = 42
+        if 'n_jobs' in params and cls in (*models["random_forest"], *models["knn"]):
+            # Forests fit trees and KNN queries neighbors on all cores
+            kwargs["n_jobs"] = -1
+        return cls(**kwargs)
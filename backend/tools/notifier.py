@@ -2,12 +2,86 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any
+from typing import Any, Awaitable, Callable
 
-import httpx
+from tools import BaseTool, get_http_client
 
-from tools import BaseTool
+
+# Telegram messages in flight at once for NotifierTool.send_many (the Bot
+# API allows about 30 messages per second per bot)
+_TELEGRAM_CONCURRENCY = 16
+
+# ── coalescing ──────────────────────────────────────────────────
+# Slack/Discord messages for the same webhook that arrive within
+# _COALESCE_WINDOW seconds are joined with newlines and posted once.
+# A batch is sent early when it reaches _COALESCE_MAX messages or the next
+# message would exceed the channel's text limit.
+
+_COALESCE_WINDOW = 0.05
+_COALESCE_MAX = 16
+_COALESCE_LIMITS = {"slack": 40_000, "discord": 2000}
+
+Post = Callable[[str, str, int], Awaitable[str]]
+
+
+class _Batch:
+    """Messages waiting to be posted to one webhook, with their callers."""
+
+    def __init__(self, post: Post) -> None:
+        self.post = post
+        self.messages: list[str] = []
+        self.waiters: list[asyncio.Future[str]] = []
+        self.timeout = 0
+        self.chars = 0
+
+
+# (channel, webhook_url) -> open batch
+_PENDING: dict[tuple[str, str], _Batch] = {}
+# Running deliveries, referenced so they are not garbage collected
+_DELIVERIES: set[asyncio.Task] = set()
+
+
+async def _coalesced(channel: str, url: str, message: str, timeout: int, post: Post) -> str:
+    """Queue *message* for *url* and return the result of the shared post."""
+    key = (channel, url)
+    batch = _PENDING.get(key)
+    if batch is not None and batch.chars + 1 + len(message) > _COALESCE_LIMITS[channel]:
+        _flush(key, batch, url)
+        batch = None
+    if batch is None:
+        batch = _PENDING[key] = _Batch(post)
+        asyncio.get_running_loop().call_later(_COALESCE_WINDOW, _flush, key, batch, url)
+
+    waiter: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+    batch.messages.append(message)
+    batch.waiters.append(waiter)
+    batch.timeout = max(batch.timeout, timeout)
+    batch.chars += len(message) + (1 if batch.chars else 0)
+    if len(batch.messages) >= _COALESCE_MAX:
+        _flush(key, batch, url)
+    return await waiter
+
+
+def _flush(key: tuple[str, str], batch: _Batch, url: str) -> None:
+    """Close *batch* (once) and post it in the background."""
+    if _PENDING.get(key) is not batch:
+        return
+    del _PENDING[key]
+    task = asyncio.get_running_loop().create_task(_deliver(batch, url))
+    _DELIVERIES.add(task)
+    task.add_done_callback(_DELIVERIES.discard)
+
+
+async def _deliver(batch: _Batch, url: str) -> None:
+    try:
+        result = await batch.post(url, "\n".join(batch.messages), batch.timeout)
+    except Exception as e:
+        result = f"[notifier] Error: {e}"
+    for waiter in batch.waiters:
+        if not waiter.done():
+            waiter.set_result(result)
 
 
 class NotifierTool(BaseTool):
@@ -36,6 +110,11 @@ class NotifierTool(BaseTool):
         if channel == "discord":
             return await self._send_discord(webhook_url, message, timeout)
         if channel == "telegram":
+            # Several comma-separated chat ids get the message concurrently
+            chat_ids = [c.strip() for c in chat_id.split(",") if c.strip()]
+            if len(chat_ids) > 1:
+                results = await self.send_many([(c, message) for c in chat_ids], bot_token, timeout)
+                return "\n".join(results)
             return await self._send_telegram(bot_token, chat_id, message, timeout)
         if channel == "webhook":
             return await self._send_webhook(webhook_url, method, headers_raw, message, timeout)
@@ -45,13 +124,17 @@ class NotifierTool(BaseTool):
     async def _send_slack(self, webhook_url: str, message: str, timeout: int) -> str:
         if not webhook_url:
             return "[notifier] Slack webhook_url is required."
+        return await _coalesced("slack", webhook_url, message, timeout, self._post_slack)
+
+    @staticmethod
+    async def _post_slack(webhook_url: str, message: str, timeout: int) -> str:
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(
-                    webhook_url,
-                    json={"text": message},
-                    headers={"Content-Type": "application/json"},
-                )
+            resp = await get_http_client().post(
+                webhook_url,
+                json={"text": message},
+                headers={"Content-Type": "application/json"},
+                timeout=timeout,
+            )
             if resp.status_code == 200:
                 return f"Slack notification sent successfully."
             return f"[notifier] Slack returned {resp.status_code}: {resp.text[:200]}"
@@ -61,6 +144,13 @@ class NotifierTool(BaseTool):
     async def _send_discord(self, webhook_url: str, message: str, timeout: int) -> str:
         if not webhook_url:
             return "[notifier] Discord webhook_url is required."
+        if len(message) > 2000:
+            # Sent on its own as an embed
+            return await self._post_discord(webhook_url, message, timeout)
+        return await _coalesced("discord", webhook_url, message, timeout, self._post_discord)
+
+    @staticmethod
+    async def _post_discord(webhook_url: str, message: str, timeout: int) -> str:
         try:
             # Discord supports content (plain) and embeds
             payload: dict[str, Any] = {"content": message[:2000]}
@@ -74,12 +164,12 @@ class NotifierTool(BaseTool):
                         "color": 5814783,  # Blue
                     }],
                 }
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(
-                    webhook_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                )
+            resp = await get_http_client().post(
+                webhook_url,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=timeout,
+            )
             if resp.status_code in (200, 204):
                 return f"Discord notification sent successfully."
             return f"[notifier] Discord returned {resp.status_code}: {resp.text[:200]}"
@@ -93,12 +183,11 @@ class NotifierTool(BaseTool):
             return "[notifier] Telegram chat_id is required."
         try:
             url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(url, json={
-                    "chat_id": chat_id,
-                    "text": message[:4096],
-                    "parse_mode": "Markdown",
-                })
+            resp = await get_http_client().post(url, json={
+                "chat_id": chat_id,
+                "text": message[:4096],
+                "parse_mode": "Markdown",
+            }, timeout=timeout)
             data = resp.json()
             if data.get("ok"):
                 return f"Telegram notification sent to chat {chat_id}."
@@ -106,6 +195,22 @@ class NotifierTool(BaseTool):
         except Exception as e:
             return f"[notifier] Telegram error: {e}"
 
+    async def send_many(
+        self, messages: list[tuple[str, str]], bot_token: str, timeout: int = 10,
+    ) -> list[str]:
+        """Send (chat_id, message) pairs through Telegram concurrently.
+
+        Requests are multiplexed over the shared HTTP/2 connection, at most
+        _TELEGRAM_CONCURRENCY at a time; results come back in input order.
+        """
+        sem = asyncio.Semaphore(_TELEGRAM_CONCURRENCY)
+
+        async def one(chat_id: str, message: str) -> str:
+            async with sem:
+                return await self._send_telegram(bot_token, chat_id, message, timeout)
+
+        return list(await asyncio.gather(*(one(c, m) for c, m in messages)))
+
     async def _send_webhook(self, url: str, method: str, headers_raw: str, message: str, timeout: int) -> str:
         if not url:
             return "[notifier] Webhook URL is required."
@@ -121,8 +226,7 @@ class NotifierTool(BaseTool):
 
         try:
             body = json.dumps({"message": message, "source": "gennaro"})
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.request(method, url, content=body, headers=headers)
+            resp = await get_http_client().request(method, url, content=body, headers=headers, timeout=timeout)
             return f"Webhook {method} {url} → {resp.status_code} {resp.reason_phrase}"
         except Exception as e:
             return f"[notifier] Webhook error: {e}"
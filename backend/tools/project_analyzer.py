@@ -3,8 +3,13 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import heapq
 import json
-from collections import Counter
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
@@ -40,6 +45,9 @@ KEY_FILES: dict[str, list[str]] = {
     "architecture": ["CLAUDE.md", "ARCHITECTURE.md", "CONTRIBUTING.md", "HACKING.md"],
 }
 
+# Files _extract_dependencies reads
+_DEPENDENCY_FILES = {"requirements.txt", "pyproject.toml", "package.json", "Cargo.toml", "go.mod"}
+
 # Project type detection
 PROJECT_MARKERS: dict[str, str] = {
     "package.json": "Node.js / JavaScript",
@@ -78,6 +86,9 @@ class ProjectAnalyzerTool(BaseTool):
         max_depth = int(kwargs.get("max_depth", 4))
         max_file_size = int(kwargs.get("max_file_size", 50000))
         max_files_read = int(kwargs.get("max_files_read", 20))
+        # Threads walking top-level directories for the file statistics;
+        # readdir/stat latency overlaps, which pays off on network storage
+        stat_threads = int(kwargs.get("stat_threads", 0) or min(32, (os.cpu_count() or 1) * 4))
 
         root = Path(project_path)
         if not root.exists():
@@ -86,7 +97,7 @@ class ProjectAnalyzerTool(BaseTool):
             return f"Error: '{project_path}' is not a directory."
 
         return await asyncio.to_thread(
-            self._analyze_sync, root, max_depth, max_file_size, max_files_read
+            self._analyze_sync, root, max_depth, max_file_size, max_files_read, stat_threads
         )
 
     @staticmethod
@@ -95,18 +106,27 @@ class ProjectAnalyzerTool(BaseTool):
         max_depth: int,
         max_file_size: int,
         max_files_read: int,
+        stat_threads: int = 1,
     ) -> str:
         project_name = root.name
         sections: list[str] = []
         sections.append(f"# Project Analysis: {project_name}\n")
 
+        # One scandir per directory serves every section below
+        scan = _scan_once(root, max_depth, stat_threads)
+        listings = scan["listings"]
+
         # ── 1. Detect project types ────────────────────────
         detected_types: list[str] = []
         # Check root and immediate subdirectories (monorepo support)
-        search_dirs = [root] + [d for d in root.iterdir() if d.is_dir() and not _should_ignore(d.relative_to(root))]
+        search_dirs = [root] + [
+            root / name for name, entry in listings[str(root)].items()
+            if entry.is_dir() and not (info := _name_info(name))[0] and info[1] not in IGNORE_EXTENSIONS
+        ]
         for search_dir in search_dirs:
+            names = _listing(listings, search_dir)
             for marker_file, ptype in PROJECT_MARKERS.items():
-                if (search_dir / marker_file).exists():
+                if marker_file in names and (search_dir / marker_file).exists():
                     loc = search_dir.relative_to(root) if search_dir != root else Path(".")
                     detected_types.append(f"{ptype} (`{loc}/{marker_file}`)")
 
@@ -119,7 +139,7 @@ class ProjectAnalyzerTool(BaseTool):
             sections.append("## Project Type\n\nCould not detect project type automatically.\n")
 
         # ── 2. Directory tree ──────────────────────────────
-        tree_lines = _build_tree(root, max_depth)
+        tree_lines = scan["tree"]
         sections.append("## Directory Structure\n")
         sections.append("```")
         sections.append("\n".join(tree_lines[:500]))  # cap at 500 lines
@@ -128,20 +148,9 @@ class ProjectAnalyzerTool(BaseTool):
         sections.append("```\n")
 
         # ── 3. File statistics ─────────────────────────────
-        ext_counter: Counter[str] = Counter()
-        total_files = 0
-        total_dirs = 0
-
-        for p in root.rglob("*"):
-            rel = p.relative_to(root)
-            if _should_ignore(rel):
-                continue
-            if p.is_dir():
-                total_dirs += 1
-            elif p.is_file():
-                total_files += 1
-                ext = p.suffix.lower() or "(no extension)"
-                ext_counter[ext] += 1
+        total_files = scan["files"]
+        total_dirs = scan["dirs"]
+        ext_counter = scan["extensions"]
 
         sections.append("## File Statistics\n")
         sections.append(f"- Total files: {total_files}")
@@ -150,13 +159,16 @@ class ProjectAnalyzerTool(BaseTool):
         if ext_counter:
             sections.append("| Extension | Count |")
             sections.append("|-----------|-------|")
-            for ext, count in ext_counter.most_common(20):
+            # Same order as sorted(..., reverse=True)[:20], without sorting it all
+            for ext, count in heapq.nlargest(20, ext_counter.items(), key=itemgetter(1)):
                 sections.append(f"| {ext} | {count} |")
             sections.append("")
 
         # ── 4. Dependencies ────────────────────────────────
         deps_parts: list[str] = []
         for search_dir in search_dirs:
+            if _DEPENDENCY_FILES.isdisjoint(_listing(listings, search_dir)):
+                continue
             dep = _extract_dependencies(search_dir)
             if dep:
                 if search_dir != root:
@@ -180,9 +192,13 @@ class ProjectAnalyzerTool(BaseTool):
             for search_dir in search_dirs:
                 if found:
                     break
+                names = _listing(listings, search_dir)
                 for fname in candidates:
+                    # Only stat candidates whose first component is listed
+                    if fname.partition("/")[0] not in names:
+                        continue
                     fpath = search_dir / fname
-                    if not fpath.exists() or not fpath.is_file():
+                    if not fpath.is_file():
                         continue
                     try:
                         size = fpath.stat().st_size
@@ -210,48 +226,194 @@ class ProjectAnalyzerTool(BaseTool):
 # ── Helper functions ──────────────────────────────────────
 
 
-def _should_ignore(rel_path: Path) -> bool:
-    """Check if a relative path should be ignored."""
-    for part in rel_path.parts:
-        if part in IGNORE_DIRS:
-            return True
-        if part.startswith(".") and part not in (".", ".."):
-            # Skip hidden dirs/files except some known ones
-            if part not in (".github", ".gitlab", ".env.example", ".env.sample"):
-                return True
-    if rel_path.suffix.lower() in IGNORE_EXTENSIONS:
+def _ignored_name(name: str) -> bool:
+    """Whether a path component hides the entry and everything below it."""
+    if name in IGNORE_DIRS:
         return True
+    if name.startswith(".") and name not in (".", ".."):
+        # Skip hidden dirs/files except some known ones
+        if name not in (".github", ".gitlab", ".env.example", ".env.sample"):
+            return True
     return False
 
 
-def _build_tree(root: Path, max_depth: int) -> list[str]:
-    """Build an indented directory tree."""
-    lines: list[str] = [root.name + "/"]
+@functools.lru_cache(maxsize=8192)
+def _name_info(name: str) -> tuple[bool, str]:
+    """(_ignored_name(name), lowercased suffix) for an entry name.
 
-    def _walk(directory: Path, prefix: str, depth: int) -> None:
-        if depth > max_depth:
-            return
+    Cached: walks see the same names over and over (src, index.js,
+    __init__.py).
+    """
+    # Interned: every name with a given suffix shares one key string
+    return _ignored_name(name), sys.intern(_suffix(name).lower())
 
-        try:
-            entries = sorted(directory.iterdir(), key=lambda p: (not p.is_dir(), p.name.lower()))
-        except PermissionError:
-            return
 
-        # Filter out ignored entries
-        entries = [e for e in entries if not _should_ignore(e.relative_to(root))]
+def _suffix(name: str) -> str:
+    """PurePath.suffix of a bare file name, without building a Path."""
+    i = name.rfind(".")
+    return name[i:] if 0 < i < len(name) - 1 else ""
 
-        for i, entry in enumerate(entries):
-            is_last = i == len(entries) - 1
-            connector = "└── " if is_last else "├── "
-            display = entry.name + ("/" if entry.is_dir() else "")
-            lines.append(f"{prefix}{connector}{display}")
 
-            if entry.is_dir() and depth < max_depth:
-                extension = "    " if is_last else "│   "
-                _walk(entry, prefix + extension, depth + 1)
+def _walk_scandir(root: str):
+    """Yield os.DirEntry for everything under *root* not hidden by _ignored_name.
 
-    _walk(root, "", 1)
-    return lines
+    Ignored directories are pruned rather than walked and filtered, and
+    DirEntry answers is_dir()/is_file() from the readdir type where it can.
+    Order matches Path.rglob: a directory's entries, then its subdirectories
+    depth-first. Symlinked directories are listed but not descended into.
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = [e for e in it if not _name_info(e.name)[0]]
+        except OSError:
+            continue
+        subdirs: list[str] = []
+        for entry in entries:
+            yield entry
+            if entry.is_dir() and not entry.is_symlink():
+                subdirs.append(entry.path)
+        # Reversed, so the first subdirectory is walked first
+        stack.extend(reversed(subdirs))
+
+
+def _tally(entries: Any) -> tuple[int, int, dict[str, int]]:
+    """Count files, directories and file extensions among DirEntry objects."""
+    ext_counter: dict[str, int] = {}
+    total_files = 0
+    total_dirs = 0
+    for entry in entries:
+        suffix = _name_info(entry.name)[1]
+        if suffix in IGNORE_EXTENSIONS:
+            continue
+        if entry.is_dir():
+            total_dirs += 1
+        elif entry.is_file():
+            total_files += 1
+            ext = suffix or "(no extension)"
+            ext_counter[ext] = ext_counter.get(ext, 0) + 1
+    return total_files, total_dirs, ext_counter
+
+
+def _subtree_stats(top: str) -> tuple[int, int, dict[str, int]]:
+    """_tally over everything below the directory *top*."""
+    return _tally(_walk_scandir(top))
+
+
+def _scan_once(root: Path, max_depth: int, stat_threads: int) -> dict[str, Any]:
+    """Walk *root* once for the tree, the file statistics and the listings.
+
+    Returns "tree" (lines down to *max_depth*), "files", "dirs",
+    "extensions" (counts in first-seen order) and "listings": the raw
+    entries of *root* and of each top-level directory, keyed by path, for
+    the marker and key-file lookups. With *stat_threads* > 1 the
+    top-level directories are walked concurrently.
+    """
+    listings: dict[str, dict[str, os.DirEntry]] = {}
+    if stat_threads > 1:
+        with ThreadPoolExecutor(max_workers=stat_threads) as pool:
+            lines, files, dirs, counts = _scan_dir(str(root), "", 1, max_depth, True, listings, pool.map)
+    else:
+        lines, files, dirs, counts = _scan_dir(str(root), "", 1, max_depth, True, listings)
+    return {
+        "tree": [root.name + "/"] + lines,
+        "files": files,
+        "dirs": dirs,
+        "extensions": counts,
+        "listings": listings,
+    }
+
+
+def _scan_dir(
+    path: str,
+    prefix: str,
+    depth: int,
+    max_depth: int,
+    count: bool,
+    listings: dict[str, dict[str, os.DirEntry]] | None = None,
+    mapper: Any = map,
+) -> tuple[list[str], int, int, dict[str, int]]:
+    """Scan *path* once for both its tree rows and (when *count*) its statistics.
+
+    Returns (tree lines below *path*, files, dirs, extension counts).
+    Statistics cover the whole subtree in Path.rglob order; directories the
+    tree does not open are counted by _subtree_stats. Symlinked directories
+    are opened for the tree but not counted. *listings* receives the raw
+    entries of *path* and its subdirectories; *mapper* runs the
+    subdirectory walks.
+    """
+    try:
+        with os.scandir(path) as it:
+            raw = list(it)
+    except OSError:
+        return [], 0, 0, {}
+    if listings is not None:
+        listings[path] = {e.name: e for e in raw}
+    entries = [e for e in raw if not _name_info(e.name)[0]]
+    files, dirs, counts = _tally(entries) if count else (0, 0, {})
+
+    # Tree rows, sorted dirs first; opened directories get their prefix
+    rows: list[tuple[str, str | None]] = []
+    opened: dict[str, str] = {}
+    if depth <= max_depth:
+        visible = sorted(
+            ((e.is_dir(), e) for e in entries if _name_info(e.name)[1] not in IGNORE_EXTENSIONS),
+            key=lambda t: (not t[0], t[1].name.lower()),
+        )
+        for i, (is_dir, entry) in enumerate(visible):
+            is_last = i == len(visible) - 1
+            connector = "└── " if is_last else "├── "
+            display = entry.name + ("/" if is_dir else "")
+            if is_dir and depth < max_depth:
+                opened[entry.path] = prefix + ("    " if is_last else "│   ")
+            rows.append((f"{prefix}{connector}{display}", entry.path if entry.path in opened else None))
+
+    # Subdirectories in walk order, so counts merge as in a serial rglob
+    jobs: list[tuple[Any, tuple[Any, ...]]] = []
+    for entry in entries:
+        walk_stats = count and entry.is_dir() and not entry.is_symlink()
+        if entry.path in opened:
+            sub_listings = listings if depth == 1 else None
+            jobs.append((_scan_dir, (entry.path, opened[entry.path], depth + 1, max_depth, walk_stats, sub_listings)))
+        elif walk_stats:
+            jobs.append((_subtree_scan, (entry.path,)))
+    sub_lines: dict[str, list[str]] = {}
+    for (_fn, args), (lines, n_files, n_dirs, sub_counts) in zip(jobs, mapper(_run_job, jobs)):
+        sub_lines[args[0]] = lines
+        files += n_files
+        dirs += n_dirs
+        for ext, n in sub_counts.items():
+            counts[ext] = counts.get(ext, 0) + n
+
+    tree: list[str] = []
+    for line, sub_path in rows:
+        tree.append(line)
+        if sub_path is not None:
+            tree.extend(sub_lines[sub_path])
+    return tree, files, dirs, counts
+
+
+def _run_job(job: tuple[Any, tuple[Any, ...]]) -> Any:
+    fn, args = job
+    return fn(*args)
+
+
+def _subtree_scan(top: str) -> tuple[list[str], int, int, dict[str, int]]:
+    """_subtree_stats in _scan_dir's result shape (no tree rows)."""
+    return [], *_subtree_stats(top)
+
+
+def _listing(listings: dict[str, dict[str, os.DirEntry]], directory: Path) -> dict[str, os.DirEntry]:
+    """Raw entries of *directory*: from the scan, or listed now if it skipped it."""
+    path = str(directory)
+    if path not in listings:
+        try:
+            with os.scandir(path) as it:
+                listings[path] = {e.name: e for e in it}
+        except OSError:
+            listings[path] = {}
+    return listings[path]
 
 
 def _extract_dependencies(root: Path) -> str:
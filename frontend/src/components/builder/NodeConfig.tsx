@@ -584,6 +584,8 @@ export function NodeConfig({ node, onClose, onUpdate }: Props) {
                   >
                     <option value="random_forest">Random Forest</option>
                     <option value="gradient_boosting">Gradient Boosting</option>
+                    <option value="hist_gb">Histogram Gradient Boosting</option>
+                    <option value="lightgbm">LightGBM</option>
                     <option value="linear">Linear / Logistic</option>
                     <option value="svm">SVM</option>
                     <option value="knn">K-Nearest Neighbors</option>